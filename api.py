@@ -1,22 +1,150 @@
+import asyncio
+import codecs
+import logging
+import logging.handlers
 import os
+import queue
 import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 
+import anyio
+
 from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 
-from core.processor import DeepgramProcessor
 from core.llm import create_llm_provider
 from core.config_manager import ConfigManager
+from core.limiter import RequestLimiter, limit
+from core.http_client import close_async_http_client
+
+try:
+    # orjson encodes large transcript/summary payloads several times faster
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    DefaultResponse = JSONResponse
 
 # Load environment variables
 load_dotenv()
 
+
+def _setup_logging() -> logging.handlers.QueueListener:
+    """
+    Route log records through a queue so stdout writes happen on a background
+    thread instead of inside request handlers.
+    """
+    log_queue = queue.Queue(-1)
+    logging.basicConfig(
+        level=logging.INFO,
+        handlers=[logging.handlers.QueueHandler(log_queue)],
+    )
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
+
+log_listener = _setup_logging()
+logger = logging.getLogger(__name__)
+
+# Uploaded audio is staged here while Deepgram processes it.
+# RAM-backed /dev/shm is used when available; override with TEMP_UPLOADS_DIR.
+TEMP_UPLOAD_DIR = os.environ.get(
+    "TEMP_UPLOADS_DIR",
+    "/dev/shm/meeting_uploads" if os.path.isdir("/dev/shm") else "temp_uploads",
+)
+
+# Leftover uploads (e.g. from a killed worker) older than this are deleted by the sweeper
+TEMP_UPLOAD_MAX_AGE = 3600
+TEMP_UPLOAD_SWEEP_INTERVAL = 60
+
+# Chunk size for copying uploads to disk (1 MiB keeps syscalls low on multi-GB files)
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+def _copy_upload(src, dst) -> None:
+    """
+    Copy an uploaded file object into dst.
+
+    On Linux, once Starlette has spooled the upload to a real temp file, the copy
+    is done kernel-side with os.sendfile (no user-space buffers). Small uploads
+    still held in memory, and other platforms, use a chunked copyfileobj.
+    """
+    # SpooledTemporaryFile.fileno() would force an in-memory upload to disk, so check first
+    if sys.platform.startswith("linux") and getattr(src, "_rolled", False):
+        try:
+            in_fd, out_fd = src.fileno(), dst.fileno()
+            start = offset = src.tell()
+            size = os.fstat(in_fd).st_size
+            while offset < size:
+                sent = os.sendfile(out_fd, in_fd, offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            return
+        except OSError:
+            # e.g. filesystems without sendfile support: fall back to a plain copy
+            dst.seek(0)
+            dst.truncate()
+            src.seek(start)
+
+    shutil.copyfileobj(src, dst, UPLOAD_CHUNK_SIZE)
+
+
+async def _iter_upload(file: UploadFile, chunk_size: int = UPLOAD_CHUNK_SIZE):
+    """Yields the uploaded file body in chunks, giving control back to the event loop in between."""
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _download_filename(upload_name: str, default: str, suffix: str) -> str:
+    """Builds the Markdown download name from the uploaded file's base name."""
+    base_name = os.path.splitext(os.path.basename(upload_name or ""))[0] or default
+    # Keep the Content-Disposition header well-formed
+    base_name = base_name.replace('"', "").replace("\\", "")
+    return f"{base_name}{suffix}.md"
+
+
+async def _markdown_response(chunks, filename: str) -> Response:
+    """
+    Sends summary chunks (an async iterator) to the client as a downloadable Markdown file.
+
+    A summary that arrives in one piece (cache hit, non-streaming provider) is sent
+    as a plain Response with Content-Length; otherwise it is streamed as generated.
+    """
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    media_type = "text/markdown; charset=utf-8"
+
+    # Pull the first chunks before sending headers, so provider errors still become a 500
+    first = await anext(chunks, "")
+    second = await anext(chunks, None)
+    if second is None:
+        return Response(content=first.encode("utf-8"), media_type=media_type, headers=headers)
+
+    async def body():
+        yield first.encode("utf-8")
+        yield second.encode("utf-8")
+        async for chunk in chunks:
+            yield chunk.encode("utf-8")
+
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
+
+
 app = FastAPI(
     title="Meeting Assistant API",
     description="API for transcribing and summarizing meeting recordings",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=DefaultResponse
 )
 
 # 1. Setup keys & Config
@@ -27,7 +155,74 @@ llm_key = config.get_llm_api_key()
 if not deepgram_key or not llm_key:
     # We'll log error but won't crash the import, 
     # but endpoints will fail if keys are missing
-    print("[!] Warning: API keys missing in environment")
+    logger.warning("[!] Warning: API keys missing in environment")
+
+# Heavy endpoints (Deepgram + LLM) share one in-flight limit; extra requests get 503
+limiter = RequestLimiter(config.get_concurrent_requests())
+
+
+# Worker threads for upload copies; a dedicated limiter, so anyio's global one (shared by sync
+# dependencies, UploadFile I/O and run_in_threadpool everywhere) keeps its default size
+upload_io_limiter = anyio.CapacityLimiter(8)
+
+
+@app.on_event("startup")
+async def configure_threadpool():
+    """Cap worker threads used for upload copies and for blocking SDK/cache calls (asyncio.to_thread)."""
+    workers = int(config.get_server_settings().get("threadpool_workers", 8))
+    upload_io_limiter.total_tokens = workers
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=workers))
+
+
+@app.on_event("shutdown")
+async def close_http_pool():
+    """Close keep-alive connections held by the shared provider HTTP client."""
+    await close_async_http_client()
+
+
+@app.on_event("shutdown")
+def stop_log_listener():
+    """Flush queued log records before the process exits."""
+    log_listener.stop()
+
+
+def _sweep_temp_uploads(directory: str, max_age: int) -> None:
+    """Deletes files in directory not modified for max_age seconds."""
+    cutoff = time.time() - max_age
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+    except OSError as e:
+        logger.warning("[!] Warning: Failed to sweep %s: %s", directory, e)
+
+
+async def _sweep_loop() -> None:
+    while True:
+        await run_in_threadpool(_sweep_temp_uploads, TEMP_UPLOAD_DIR, TEMP_UPLOAD_MAX_AGE)
+        await asyncio.sleep(TEMP_UPLOAD_SWEEP_INTERVAL)
+
+
+_sweeper_task = None
+
+
+@app.on_event("startup")
+async def prepare_upload_dir():
+    """Create the temp upload directory once and start the leftover-file sweeper."""
+    global _sweeper_task
+    os.makedirs(TEMP_UPLOAD_DIR, exist_ok=True)
+    _sweeper_task = asyncio.create_task(_sweep_loop())
+
+
+@app.on_event("shutdown")
+async def stop_upload_sweeper():
+    if _sweeper_task is not None:
+        _sweeper_task.cancel()
+
 
 class LLMProviderName(str, Enum):
     """Supported LLM provider identifiers for per-request selection."""
@@ -45,14 +240,33 @@ class SummarizationMode(str, Enum):
     interview = "interview"
 
 
-# Initialize components
-try:
-    processor = DeepgramProcessor(api_key=deepgram_key) if deepgram_key else None
-    summarizer = create_llm_provider(config) if llm_key else None
-except Exception as e:
-    print(f"[-] Initialization Error: {e}")
-    processor = None
-    summarizer = None
+# Components are created on first use, so SDK imports stay out of cold start
+# (/health never loads Deepgram or any LLM SDK)
+_processor = None
+
+
+def get_processor():
+    """Returns the shared DeepgramProcessor, or None if it can't be created."""
+    global _processor
+    if _processor is None and deepgram_key:
+        try:
+            from core.processor import DeepgramProcessor
+            _processor = DeepgramProcessor(api_key=deepgram_key, cache_dir=config.get_transcription_cache_dir())
+        except Exception as e:
+            logger.error("[-] Initialization Error: %s", e)
+    return _processor
+
+
+def get_summarizer():
+    """Returns the default LLM provider from config.json (instances are cached by the factory)."""
+    if not llm_key:
+        return None
+    try:
+        return create_llm_provider(config)
+    except Exception as e:
+        logger.error("[-] Initialization Error: %s", e)
+        return None
+
 
 @app.get("/health", tags=["Health"])
 async def health_check():
@@ -69,6 +283,7 @@ async def health_check():
         "Если download=true, возвращает Markdown‑файл с саммари."
     ),
 )
+@limit(limiter)
 async def process_audio(
     file: UploadFile = File(...),
     download: bool = False,
@@ -76,38 +291,38 @@ async def process_audio(
     """
     Upload an audio file to transcribe and summarize using the default LLM provider from config.
     """
+    processor = get_processor()
+    summarizer = get_summarizer()
     if not processor or not summarizer:
         raise HTTPException(status_code=500, detail="API components not initialized. Check server logs for API key errors.")
 
-    # 1. Save uploaded file to a temporary location
-    temp_dir = "temp_uploads"
-    os.makedirs(temp_dir, exist_ok=True)
-    file_path = os.path.join(temp_dir, file.filename)
-    
+    # 1. Save uploaded file to a unique temporary location.
+    # The client filename is only used for its extension (Deepgram sniffs the format),
+    # so "../" tricks and concurrent uploads with the same name can't collide.
+    suffix = os.path.splitext(os.path.basename(file.filename or ""))[1]
+    file_path = None
+
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Copy in a worker thread so concurrent uploads don't block the event loop
+        with tempfile.NamedTemporaryFile(dir=TEMP_UPLOAD_DIR, suffix=suffix, delete=False) as buffer:
+            file_path = buffer.name
+            await anyio.to_thread.run_sync(_copy_upload, file.file, buffer, limiter=upload_io_limiter)
     except Exception as e:
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
 
     # 2. Process Audio
     try:
-        print(f"[*] Starting transcription for {file.filename}...")
-        transcript = processor.process_audio(file_path)
-
-        print("[*] Starting summarization...")
-        summary = summarizer.summarize(transcript)
+        logger.info("[*] Starting transcription for %s...", file.filename)
+        transcript = await processor.aprocess_audio(file_path)
 
+        logger.info("[*] Starting summarization...")
         if download:
-            safe_name = os.path.splitext(file.filename or "meeting")[0] or "meeting"
-            md_bytes = summary.encode("utf-8")
-            return StreamingResponse(
-                iter([md_bytes]),
-                media_type="text/markdown; charset=utf-8",
-                headers={
-                    "Content-Disposition": f'attachment; filename="{safe_name}_summary.md"'
-                },
-            )
+            filename = _download_filename(file.filename, "meeting", "_summary")
+            return await _markdown_response(summarizer.astream_summary(transcript), filename)
+
+        summary = await summarizer.asummarize(transcript)
 
         return {
             "filename": file.filename,
@@ -115,7 +330,7 @@ async def process_audio(
             "summary": summary,
         }
     except Exception as e:
-        print(f"[-] Processing failed: {str(e)}")
+        logger.error("[-] Processing failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
     finally:
         # 3. Cleanup temp file
@@ -133,6 +348,7 @@ async def process_audio(
         "Если download=true, возвращает Markdown‑файл."
     ),
 )
+@limit(limiter)
 async def summarize_transcript(
     file: UploadFile = File(..., description="Текстовый файл транскрипции (.txt, .md и т.п.)"),
     provider: LLMProviderName = LLMProviderName.gemini,
@@ -160,36 +376,47 @@ async def summarize_transcript(
         )
 
     try:
-        raw_bytes = await file.read()
-        if not raw_bytes:
-            raise HTTPException(status_code=400, detail="Загруженный файл пустой.")
-
+        # Decode chunk by chunk, so the upload is never read into one bytes object. The decoded
+        # parts and their join still briefly hold the text twice: the prompt builder needs one str
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="strict")
+        parts = []
+        received = 0
+        # Leading all-whitespace chunks aren't decoded until real text shows up,
+        # so whitespace-only uploads are rejected without building a str
+        pending = []
         try:
-            transcript = raw_bytes.decode("utf-8")
+            async for chunk in _iter_upload(file):
+                received += len(chunk)
+                if not parts and chunk.isspace():
+                    pending.append(chunk)
+                    continue
+                if pending:
+                    parts.extend(decoder.decode(ws) for ws in pending)
+                    pending.clear()
+                parts.append(decoder.decode(chunk))
+            parts.append(decoder.decode(b"", final=True))
         except UnicodeDecodeError:
             raise HTTPException(
                 status_code=400,
                 detail="Не удалось декодировать файл как UTF-8. Убедитесь, что это текстовый файл.",
             )
 
-        if not transcript.strip():
+        if not received:
+            raise HTTPException(status_code=400, detail="Загруженный файл пустой.")
+
+        if pending:
             raise HTTPException(status_code=400, detail="Файл не содержит текста для саммари.")
 
-        print("[*] Starting summarization from uploaded transcript file...")
-        summary = summarizer.summarize(transcript, mode=mode.value)
+        transcript = "".join(parts)
+        if not transcript.strip():
+            raise HTTPException(status_code=400, detail="Файл не содержит текста для саммари.")
 
+        logger.info("[*] Starting summarization from uploaded transcript file...")
         if download:
-            original_name = file.filename or "transcript"
-            base_name = os.path.splitext(original_name)[0] or "transcript"
-            safe_name = f"{base_name}_{provider.value}_{mode.value}"
-            md_bytes = summary.encode("utf-8")
-            return StreamingResponse(
-                iter([md_bytes]),
-                media_type="text/markdown; charset=utf-8",
-                headers={
-                    "Content-Disposition": f'attachment; filename="{safe_name}.md"'
-                },
-            )
+            filename = _download_filename(file.filename, "transcript", f"_{provider.value}_{mode.value}")
+            return await _markdown_response(summarizer.astream_summary(transcript, mode=mode.value), filename)
+
+        summary = await summarizer.asummarize(transcript, mode=mode.value)
 
         return {
             "filename": file.filename,
@@ -200,7 +427,7 @@ async def summarize_transcript(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[-] Transcript summarization failed: {e}")
+        logger.error("[-] Transcript summarization failed: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Summarization failed: {e}",
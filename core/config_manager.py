@@ -1,8 +1,21 @@
+import copy
+import functools
 import json
 import os
+from types import SimpleNamespace
 from typing import Optional, Dict, Any
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Load .env for API keys once per process (not per ConfigManager instance)
+load_dotenv()
+
+RECORDING_METHODS = frozenset({"native", "legacy", "dual"})
+
 class ConfigManager:
     """Manages application configuration from config.json with .env fallback for API keys."""
     
@@ -15,49 +28,89 @@ class ConfigManager:
         },
         "native_settings": {
             "samplerate": 48000,
-            "exclude_current_process": True
+            "exclude_current_process": True,
+            "keep_stream_alive": False
         },
         "transcription": {
             "model": "nova-2",
             "language": "ru",
             "diarize": True,
             "smart_format": True,
-            "timeout": 600
+            "timeout": 600,
+            "cache_dir": os.path.join("output", ".transcript_cache")
+        },
+        "server": {
+            "concurrent_requests": 4,
+            "threadpool_workers": 8
         },
         "llm": {
             "provider": "deepseek",
-            "model": "deepseek-chat"
+            "model": "deepseek-chat",
+            "cache": {
+                "enabled": True,
+                "backend": "memory",
+                "ttl": 3600,
+                "semantic": False,
+                "similarity_threshold": 0.92
+            },
+            "chunking": {
+                "enabled": True,
+                "threshold_tokens": 16000,
+                "max_tokens": 6000,
+                "overlap_tokens": 200,
+                "max_parallel": 4
+            },
+            "hedge": {
+                "enabled": False,
+                "providers": [],
+                "delay_ms": 3000
+            }
         }
     }
     
     def __init__(self, config_path: str = "config.json"):
         """Initialize config manager and load configuration."""
         self.config_path = config_path
+        # Parsed config is shared between instances until one of them modifies it
+        self._owns_config = False
         self.config = self._load_config()
-        
-        # Load .env for API key fallback
-        load_dotenv()
+        self._index_config()
+
+        # API keys come from the environment and don't change at runtime
+        self._api_keys = {
+            "deepgram": os.getenv("DEEPGRAM_API_KEY"),
+            "gemini": os.getenv("GEMINI_API_KEY") or os.getenv("LLM_API_KEY"),
+            "chatgpt": os.getenv("OPENAI_API_KEY"),
+            "deepseek": os.getenv("DEEPSEEK_API_KEY"),
+        }
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file or create default."""
-        if os.path.exists(self.config_path):
-            try:
-                with open(self.config_path, 'r') as f:
-                    loaded_config = json.load(f)
-                # Merge with defaults to ensure all keys exist
-                return self._merge_with_defaults(loaded_config)
-            except Exception as e:
-                print(f"[!] Warning: Failed to load config from {self.config_path}: {e}")
-                print("[*] Using default configuration.")
-                return self.DEFAULT_CONFIG.copy()
-        else:
+        try:
+            st = os.stat(self.config_path)
+        except OSError:
             # Create default config file
             self._save_config(self.DEFAULT_CONFIG)
-            return self.DEFAULT_CONFIG.copy()
+            self._owns_config = True
+            return copy.deepcopy(self.DEFAULT_CONFIG)
+        # Re-parsed only when the file changes on disk
+        return _read_config(self.config_path, st.st_mtime_ns, st.st_size)
+
+    def _index_config(self) -> None:
+        """Expose frequently read sections as attributes; call again after modifying them."""
+        self._llm = SimpleNamespace(**self.config["llm"])
+        self._transcription = SimpleNamespace(**self.config["transcription"])
+
+    def _make_writable(self) -> None:
+        """Copy the shared cached config before the first in-place modification."""
+        if not self._owns_config:
+            self.config = copy.deepcopy(self.config)
+            self._owns_config = True
     
-    def _merge_with_defaults(self, loaded: Dict[str, Any]) -> Dict[str, Any]:
+    @classmethod
+    def _merge_with_defaults(cls, loaded: Dict[str, Any]) -> Dict[str, Any]:
         """Merge loaded config with defaults to ensure all keys exist."""
-        merged = self.DEFAULT_CONFIG.copy()
+        merged = copy.deepcopy(cls.DEFAULT_CONFIG)
         
         # Deep merge
         for key, value in loaded.items():
@@ -71,8 +124,12 @@ class ConfigManager:
     def _save_config(self, config: Dict[str, Any]) -> None:
         """Save configuration to file."""
         try:
-            with open(self.config_path, 'w') as f:
-                json.dump(config, f, indent=2)
+            if orjson is not None:
+                with open(self.config_path, 'wb') as f:
+                    f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+            else:
+                with open(self.config_path, 'w') as f:
+                    json.dump(config, f, indent=2)
         except Exception as e:
             print(f"[!] Warning: Failed to save config to {self.config_path}: {e}")
     
@@ -87,8 +144,9 @@ class ConfigManager:
     
     def set_recording_method(self, method: str) -> None:
         """Set recording method."""
-        if method not in ["native", "legacy", "dual"]:
+        if method not in RECORDING_METHODS:
             raise ValueError("Recording method must be 'native', 'legacy', or 'dual'")
+        self._make_writable()
         self.config["recording_method"] = method
         self.save()
     
@@ -102,6 +160,7 @@ class ConfigManager:
     
     def set_legacy_device_name(self, device_name: str) -> None:
         """Set legacy recorder device name."""
+        self._make_writable()
         if "legacy_settings" not in self.config:
             self.config["legacy_settings"] = self.DEFAULT_CONFIG["legacy_settings"].copy()
         self.config["legacy_settings"]["device_name"] = device_name
@@ -110,19 +169,19 @@ class ConfigManager:
     # API Keys (only from environment or config override)
     def get_deepgram_api_key(self) -> Optional[str]:
         """Get Deepgram API key from .env."""
-        return os.getenv("DEEPGRAM_API_KEY")
+        return self._api_keys["deepgram"]
     
     def get_gemini_api_key(self) -> Optional[str]:
         """Get Gemini API key from .env."""
-        return os.getenv("GEMINI_API_KEY") or os.getenv("LLM_API_KEY")
+        return self._api_keys["gemini"]
 
     def get_openai_api_key(self) -> Optional[str]:
         """Get OpenAI API key from .env."""
-        return os.getenv("OPENAI_API_KEY")
+        return self._api_keys["chatgpt"]
 
     def get_deepseek_api_key(self) -> Optional[str]:
         """Get DeepSeek API key from .env."""
-        return os.getenv("DEEPSEEK_API_KEY")
+        return self._api_keys["deepseek"]
     
     # LLM Settings
     def get_llm_settings(self) -> Dict[str, Any]:
@@ -131,36 +190,55 @@ class ConfigManager:
     
     def get_llm_provider_type(self) -> str:
         """Get LLM provider type (gemini/deepseek)."""
-        return self.get_llm_settings().get("provider", "gemini")
+        return self._llm.provider
     
     def get_llm_model_name(self) -> str:
         """Get LLM model name."""
-        return self.get_llm_settings().get("model", "gemini-2.0-flash")
+        return self._llm.model
+
+    def get_llm_cache_settings(self) -> Dict[str, Any]:
+        """Get LLM response cache settings (merged with defaults)."""
+        return {**self.DEFAULT_CONFIG["llm"]["cache"], **getattr(self._llm, "cache", {})}
+
+    def get_llm_chunking_settings(self) -> Dict[str, Any]:
+        """Get long-transcript (map-reduce) summarization settings (merged with defaults)."""
+        return {**self.DEFAULT_CONFIG["llm"]["chunking"], **getattr(self._llm, "chunking", {})}
+
+    def get_llm_hedge_settings(self) -> Dict[str, Any]:
+        """Get hedged-request settings: backup providers asked when the primary is slow."""
+        return {**self.DEFAULT_CONFIG["llm"]["hedge"], **getattr(self._llm, "hedge", {})}
 
     def get_llm_api_key(self, provider: str = None) -> Optional[str]:
         """
         Get API key for the specified provider from environment variables.
         """
         if not provider:
-            provider = self.get_llm_provider_type()
-            
-        if provider == "gemini":
-            return self.get_gemini_api_key()
-        elif provider == "deepseek":
-            return self.get_deepseek_api_key()
-        elif provider == "chatgpt":
-            return self.get_openai_api_key()
-        return None
+            provider = self._llm.provider
+
+        if provider == "deepgram":
+            return None
+        return self._api_keys.get(provider)
 
     def set_llm_provider(self, provider: str, model: str) -> None:
         """Set LLM provider and model."""
+        self._make_writable()
         if "llm" not in self.config:
             self.config["llm"] = self.DEFAULT_CONFIG["llm"].copy()
             
         self.config["llm"]["provider"] = provider
         self.config["llm"]["model"] = model
+        self._index_config()
         self.save()
 
+    # Server Settings
+    def get_server_settings(self) -> Dict[str, Any]:
+        """Get Web API server settings."""
+        return {**self.DEFAULT_CONFIG["server"], **self.config.get("server", {})}
+
+    def get_concurrent_requests(self) -> int:
+        """Get max number of heavy API requests processed at the same time."""
+        return int(self.get_server_settings().get("concurrent_requests", 4))
+
     # Transcription Settings
     def get_transcription_settings(self) -> Dict[str, Any]:
         """Get transcription settings."""
@@ -168,12 +246,34 @@ class ConfigManager:
     
     def get_transcription_model(self) -> str:
         """Get transcription model name."""
-        return self.get_transcription_settings().get("model", "nova-2")
+        return self._transcription.model
     
     def get_transcription_language(self) -> str:
         """Get transcription language."""
-        return self.get_transcription_settings().get("language", "ru")
+        return self._transcription.language
     
     def get_transcription_timeout(self) -> int:
         """Get transcription timeout in seconds."""
-        return self.get_transcription_settings().get("timeout", 600)
+        return self._transcription.timeout
+
+    def get_transcription_cache_dir(self) -> Optional[str]:
+        """Get the transcript cache directory (None if the cache is disabled)."""
+        return self._transcription.cache_dir
+
+
+@functools.lru_cache(maxsize=8)
+def _read_config(config_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse config.json once per (path, mtime, size); callers must not mutate the result."""
+    try:
+        if orjson is not None:
+            with open(config_path, 'rb') as f:
+                loaded_config = orjson.loads(f.read())
+        else:
+            with open(config_path, 'r') as f:
+                loaded_config = json.load(f)
+        # Merge with defaults to ensure all keys exist
+        return ConfigManager._merge_with_defaults(loaded_config)
+    except Exception as e:
+        print(f"[!] Warning: Failed to load config from {config_path}: {e}")
+        print("[*] Using default configuration.")
+        return copy.deepcopy(ConfigManager.DEFAULT_CONFIG)
@@ -0,0 +1,64 @@
+"""Process-wide HTTP connection pools shared by the Deepgram and LLM SDK clients."""
+import atexit
+import threading
+from typing import Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Upper bound for a single request (long Deepgram uploads); SDKs also pass their own per-request timeouts
+DEFAULT_TIMEOUT = 600
+# Connecting is bounded separately, so an unreachable host fails fast into the callers' retries
+CONNECT_TIMEOUT = 10
+_TIMEOUT = httpx.Timeout(DEFAULT_TIMEOUT, connect=CONNECT_TIMEOUT)
+
+_ASYNC_CLIENT: Optional[httpx.AsyncClient] = None
+_SYNC_CLIENT: Optional[httpx.Client] = None
+_SYNC_CLIENT_LOCK = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Returns the shared blocking keep-alive client (CLI and other sync SDK calls),
+    creating it on first use. Closed at interpreter exit.
+    """
+    global _SYNC_CLIENT
+    with _SYNC_CLIENT_LOCK:
+        if _SYNC_CLIENT is None:
+            _SYNC_CLIENT = httpx.Client(
+                http2=HTTP2_AVAILABLE,
+                timeout=_TIMEOUT,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            )
+            atexit.register(_SYNC_CLIENT.close)
+        return _SYNC_CLIENT
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared keep-alive client, creating it on first use.
+
+    Connections (and TLS sessions) are pooled per host, so DeepSeek, OpenAI and
+    Deepgram calls from concurrent requests reuse them instead of reconnecting.
+    """
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None:
+        _ASYNC_CLIENT = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=_TIMEOUT,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        )
+    return _ASYNC_CLIENT
+
+
+async def close_async_http_client() -> None:
+    """Closes the shared client (call on server shutdown)."""
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is not None:
+        await _ASYNC_CLIENT.aclose()
+        _ASYNC_CLIENT = None
@@ -0,0 +1,97 @@
+"""Backpressure for the Web API: cap the number of in-flight heavy requests."""
+import asyncio
+import functools
+import weakref
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+
+class RequestLimiter:
+    """
+    Allows at most `max_concurrent` requests at a time.
+
+    Extra requests are rejected with 503 right away instead of queueing, so a
+    surge can't pile up temp files, Deepgram/LLM quota and event-loop work.
+    """
+
+    def __init__(self, max_concurrent: int):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.max_concurrent = max_concurrent
+        self._sem = asyncio.Semaphore(max_concurrent)
+
+    async def acquire(self) -> None:
+        """Takes a permit, or raises 503 if all of them are in use."""
+        if self._sem.locked():
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy, please retry later.",
+                headers={"Retry-After": "5"},
+            )
+        await self._sem.acquire()
+
+    def release(self) -> None:
+        self._sem.release()
+
+    async def __aenter__(self) -> "RequestLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        self.release()
+        return False
+
+
+class _Permit:
+    """One acquired limiter permit, given back exactly once."""
+
+    def __init__(self, limiter: RequestLimiter):
+        self._limiter = limiter
+        self._held = True
+
+    def release(self) -> None:
+        if self._held:
+            self._held = False
+            self._limiter.release()
+
+
+async def _release_when_done(body, permit: _Permit):
+    """Passes the response body through and gives the permit back once it's exhausted or abandoned."""
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        permit.release()
+
+
+def limit(limiter: RequestLimiter):
+    """
+    Decorator form of `async with limiter:` for FastAPI endpoints.
+
+    A StreamingResponse keeps the permit until its body is fully sent, since
+    that's when a streamed summary is actually generated.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            await limiter.acquire()
+            try:
+                response = await func(*args, **kwargs)
+            except BaseException:
+                limiter.release()
+                raise
+            if isinstance(response, StreamingResponse):
+                permit = _Permit(limiter)
+                response.body_iterator = _release_when_done(response.body_iterator, permit)
+                # A response that's never sent (client gone, middleware error) never starts
+                # its body: the permit then goes back when the response is discarded
+                weakref.finalize(response, permit.release)
+                return response
+            limiter.release()
+            return response
+
+        return wrapper
+
+    return decorator
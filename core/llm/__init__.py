@@ -1,35 +1,93 @@
+import atexit
+import functools
+import importlib
+import weakref
 from typing import Optional
 
 from .base import LLMProvider
-from .gemini_provider import GeminiProvider
-from .deepseek_provider import DeepSeekProvider
-from .chatgpt_provider import ChatGPTProvider
+from .cache import CachingProvider, get_shared_cache
+from .chunker import ChunkedProvider
+from .hedged import HedgedProvider
 from core.config_manager import ConfigManager
 
+# Provider modules are imported on first use, so only the SDK of the provider
+# actually in use gets loaded (e.g. no google.genai for DeepSeek-only setups)
+_PROVIDER_CLASSES = {
+    "gemini": (".gemini_provider", "GeminiProvider"),
+    "deepseek": (".deepseek_provider", "DeepSeekProvider"),
+    "chatgpt": (".chatgpt_provider", "ChatGPTProvider"),
+}
+
+
+def _provider_class(provider_type: str):
+    module_name, class_name = _PROVIDER_CLASSES[provider_type]
+    return getattr(importlib.import_module(module_name, __name__), class_name)
+
+
+def __getattr__(name: str):
+    # Keeps `from core.llm import GeminiProvider` working without eager imports
+    for provider_type, (_, class_name) in _PROVIDER_CLASSES.items():
+        if name == class_name:
+            return _provider_class(provider_type)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_DEFAULT_MODELS = {
+    "gemini": "gemini-2.0-flash",
+    "deepseek": "deepseek-chat",
+    "chatgpt": "gpt-4o",
+}
+
 
 def _default_model_for_provider(provider_type: str) -> str:
     """
     Возвращает разумную модель по умолчанию для каждого провайдера,
     когда выбран провайдер, отличный от того, что прописан в config.json.
     """
-    if provider_type == "gemini":
-        return "gemini-2.0-flash"
-    if provider_type == "deepseek":
-        return "deepseek-chat"
-    if provider_type == "chatgpt":
-        return "gpt-4o"
-    return ""
+    return _DEFAULT_MODELS.get(provider_type, "")
+
+
+# Providers built by _cached_provider, closed at interpreter exit
+_LIVE_PROVIDERS = weakref.WeakSet()
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_provider(provider_type: str, model_name: str, api_key: Optional[str]) -> LLMProvider:
+    """
+    Builds the provider once per (provider, model, key), so the SDK client and its
+    HTTP connection pool are reused across requests instead of re-created each time.
+    """
+    if provider_type not in _PROVIDER_CLASSES:
+        raise ValueError(f"Unknown LLM provider: {provider_type}")
+
+    provider = _provider_class(provider_type)(api_key=api_key, model_name=model_name)
+
+    _LIVE_PROVIDERS.add(provider)
+    return provider
+
+
+@atexit.register
+def _close_providers() -> None:
+    for provider in list(_LIVE_PROVIDERS):
+        try:
+            provider.close()
+        except Exception:
+            pass
 
 
 def create_llm_provider(
     config: ConfigManager,
     provider_type: Optional[str] = None,
     model_name: Optional[str] = None,
+    persistent_cache: bool = False,
 ) -> LLMProvider:
     """
     Factory function to create an LLM provider based on configuration.
     Optionally allows overriding provider type and model name.
 
+    persistent_cache: for one-shot processes (the CLI) — a "memory" response cache
+    would be gone before it could ever be hit, so the disk backend is used instead.
+
     Важно: если в API запрашивается провайдер, отличный от того, что в config.json,
     и модель не указана явно, берётся дефолтная модель для этого провайдера,
     чтобы избежать ситуаций вида 'gemini-2.0-flash' в OpenAI/DeepSeek.
@@ -49,11 +107,33 @@ def create_llm_provider(
 
     api_key = config.get_llm_api_key(provider_type)
 
-    if provider_type == "gemini":
-        return GeminiProvider(api_key=api_key, model_name=model_name)
-    elif provider_type == "deepseek":
-        return DeepSeekProvider(api_key=api_key, model_name=model_name)
-    elif provider_type == "chatgpt":
-        return ChatGPTProvider(api_key=api_key, model_name=model_name)
-    else:
-        raise ValueError(f"Unknown LLM provider: {provider_type}")
+    provider = _cached_provider(provider_type, model_name, api_key)
+    cache_settings = config.get_llm_cache_settings()
+    if persistent_cache and cache_settings.get("backend", "memory") == "memory":
+        cache_settings = {**cache_settings, "backend": "disk"}
+    cache = get_shared_cache(cache_settings)
+
+    # Хеджирование: если основной провайдер долго молчит, параллельно спрашиваем запасной
+    hedge = config.get_llm_hedge_settings()
+    if hedge.get("enabled", False):
+        backups = []
+        for backup_type in hedge.get("providers", []):
+            if backup_type == provider_type:
+                continue
+            backup_key = config.get_llm_api_key(backup_type)
+            if not backup_key:
+                print(f"[!] Warning: No API key for hedge provider '{backup_type}', skipping it")
+                continue
+            backups.append(_cached_provider(backup_type, _default_model_for_provider(backup_type), backup_key))
+        if backups:
+            provider = HedgedProvider([provider, *backups], delay_ms=int(hedge.get("delay_ms", 3000)))
+
+    # Длинные транскрипты суммаризируем по частям (параллельно), затем сводим итог
+    chunking = config.get_llm_chunking_settings()
+    if chunking.get("enabled", False):
+        provider = ChunkedProvider(provider, chunking, cache=cache)
+
+    # Повторные/почти одинаковые транскрипты отдаём из кэша, без запроса к API
+    if cache is not None:
+        return CachingProvider(provider, cache)
+    return provider
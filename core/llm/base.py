@@ -1,14 +1,87 @@
+import asyncio
+import random
+import re
 from abc import ABC, abstractmethod
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Iterator, Optional, Tuple
+
+from core.utils.prompt_manager import PromptManager
+from .tokenizer import count_tokens, truncate_tokens
+from .transcript_normalizer import normalize
+
+# Upper bound for a server-advertised retry delay (daily quota resets aren't worth waiting for)
+MAX_RETRY_AFTER = 60
+# Upper bound for the exponential backoff between attempts (before jitter)
+MAX_BACKOFF = 30
+
+# "34s", "1.5s", "20ms", "6m0s" (x-ratelimit-reset-*), or a plain number of seconds (Retry-After)
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)?")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, None: 1}
+# RetryInfo as rendered in Google API errors: 'retryDelay': '34s' or retry_delay { seconds: 34 }
+_RETRY_INFO_RE = re.compile(r"retry_?delay\W+(?:seconds\W+)?(\d+(?:\.\d+)?s?)", re.IGNORECASE)
+
+
+# Part of the context window kept free for the response (and the user prompt scaffold)
+OUTPUT_TOKEN_RESERVE = 8192
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    matches = _DURATION_RE.findall(value.strip())
+    if not matches:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit or None] for number, unit in matches)
+
+
+def _parse_http_date(value: str) -> Optional[float]:
+    """Seconds until an HTTP-date (the other Retry-After form, RFC 9110), 0 if it has passed."""
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
 
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
 
+    # Human-readable provider name for progress messages
+    display_name = "LLM"
+    # Context window of the provider's models, in tokens (None = don't check)
+    max_input_tokens: Optional[int] = None
+
     def __init__(self, api_key: str, model_name: str):
         self.api_key = api_key
         self.model_name = model_name
 
-    @abstractmethod
+    def _build_prompts(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> Tuple[str, str]:
+        """Returns (system_prompt, user_prompt) for the given mode."""
+        # Fillers and repeated turns only cost input tokens
+        transcript = normalize(transcript)
+        prompt_instance = PromptManager.get_prompt(mode)
+        system_prompt = prompt_instance.get_system_prompt()
+        transcript = self._fit_context(transcript, system_prompt)
+        user_prompt = prompt_instance.format_user_prompt(transcript, meeting_datetime)
+        return system_prompt, user_prompt
+
+    def _fit_context(self, transcript: str, system_prompt: str) -> str:
+        """
+        Truncates a transcript that wouldn't fit into the model's context window, keeping
+        its end, so the request isn't sent just to be rejected by the server.
+        (ChunkedProvider normally splits long transcripts well before this limit.)
+        """
+        if self.max_input_tokens is None:
+            return transcript
+        budget = self.max_input_tokens - OUTPUT_TOKEN_RESERVE - count_tokens(system_prompt, self.model_name)
+        # A token covers at least one UTF-8 byte (<= 4 per char), so short texts can skip counting
+        if len(transcript) * 4 <= budget or count_tokens(transcript, self.model_name) <= budget:
+            return transcript
+
+        print(f"[!] Transcript exceeds the {self.max_input_tokens}-token context of {self.model_name}, keeping its last ~{budget} tokens")
+        return "…\n" + truncate_tokens(transcript, budget, self.model_name)
+
     def summarize(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> str:
         """
         Generates a summary from the transcript.
@@ -21,4 +94,83 @@ class LLMProvider(ABC):
         Returns:
             Formatted Markdown summary.
         """
+        print(f"Generating summary with {self.display_name} ({self.model_name}) in {mode} mode...")
+        system_prompt, user_prompt = self._build_prompts(transcript, meeting_datetime, mode)
+        return self._complete(system_prompt, user_prompt)
+
+    async def asummarize(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> str:
+        """
+        Async version of summarize() for use inside an event loop (e.g. FastAPI endpoints).
+        """
+        print(f"Generating summary with {self.display_name} ({self.model_name}) in {mode} mode...")
+        system_prompt, user_prompt = self._build_prompts(transcript, meeting_datetime, mode)
+        return await self._acomplete(system_prompt, user_prompt)
+
+    def stream_summary(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> Iterator[str]:
+        """
+        Same as summarize(), but yields the Markdown summary in chunks as the model generates it.
+        """
+        print(f"Streaming summary with {self.display_name} ({self.model_name}) in {mode} mode...")
+        system_prompt, user_prompt = self._build_prompts(transcript, meeting_datetime, mode)
+        yield from self._stream(system_prompt, user_prompt)
+
+    async def astream_summary(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> AsyncIterator[str]:
+        """
+        Async version of stream_summary().
+        """
+        print(f"Streaming summary with {self.display_name} ({self.model_name}) in {mode} mode...")
+        system_prompt, user_prompt = self._build_prompts(transcript, meeting_datetime, mode)
+        async for chunk in self._astream(system_prompt, user_prompt):
+            yield chunk
+
+    @staticmethod
+    def _retry_after(e: Exception, default: float) -> float:
+        """
+        Seconds to wait before retrying a rate-limited request, as advertised by the server
+        (Retry-After / x-ratelimit-reset-* headers, or Google RetryInfo), else default.
+        """
+        headers = getattr(getattr(e, "response", None), "headers", None)
+        if headers is not None:
+            for name in ("retry-after-ms", "retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+                value = headers.get(name)
+                if value:
+                    seconds = _parse_http_date(value) if name == "retry-after" else None
+                    if seconds is None:
+                        seconds = _parse_duration(value + "ms" if name == "retry-after-ms" else value)
+                    if seconds is not None:
+                        return min(seconds, MAX_RETRY_AFTER)
+
+        match = _RETRY_INFO_RE.search(str(e))
+        if match:
+            seconds = _parse_duration(match.group(1))
+            if seconds is not None:
+                return min(seconds, MAX_RETRY_AFTER)
+        return default
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """Exponential backoff with up to 1 s of jitter, so concurrent callers don't retry in lockstep."""
+        return min(MAX_BACKOFF, 2 ** attempt) + random.random()
+
+    def close(self) -> None:
+        """Releases the SDK client's HTTP connection pool, if it has one."""
+        close = getattr(getattr(self, "client", None), "close", None)
+        if callable(close):
+            close()
+
+    @abstractmethod
+    def _complete(self, system_prompt: str, user_prompt: str) -> str:
+        """Sends the prompts to the model (with retries) and returns the full response text."""
         pass
+
+    async def _acomplete(self, system_prompt: str, user_prompt: str) -> str:
+        """Async _complete(). Providers without an async SDK run the blocking call in a worker thread."""
+        return await asyncio.to_thread(self._complete, system_prompt, user_prompt)
+
+    def _stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        """Yields response text chunks. Providers without a streaming API return it in one piece."""
+        yield self._complete(system_prompt, user_prompt)
+
+    async def _astream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        """Async _stream(). Providers without an async streaming API return it in one piece."""
+        yield await self._acomplete(system_prompt, user_prompt)
@@ -0,0 +1,412 @@
+"""Response cache for LLM summaries (exact-match + optional semantic tier)."""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from .base import LLMProvider
+from .hedged import track_backup_answers
+from core.utils.prompt_manager import PromptManager
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+
+class MemoryBackend:
+    """In-process dict backend with per-entry expiry."""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at and expires_at < time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        expires_at = time.time() + ttl if ttl else 0
+        with self._lock:
+            self._data[key] = (expires_at, value)
+
+
+class DiskBackend:
+    """One JSON file per key; survives restarts and is shared between CLI runs."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at") and entry["expires_at"] < time.time():
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            return None
+        return entry.get("value")
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        entry = {"expires_at": time.time() + ttl if ttl else 0, "value": value}
+        tmp_path = self._path(key) + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"[!] Warning: Failed to write LLM cache entry: {e}")
+
+
+class RedisBackend:
+    """Redis backend (requires the optional `redis` package)."""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("Redis cache backend requires: pip install redis")
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        if ttl:
+            self.client.setex(key, ttl, value.encode("utf-8"))
+        else:
+            self.client.set(key, value.encode("utf-8"))
+
+
+class _ScopeIndex:
+    """Embeddings and cache keys of the transcripts stored under one scope."""
+
+    __slots__ = ("keys", "matrix", "index")
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.matrix = None
+        # Inner-product FAISS index over the normalized vectors, if faiss is installed
+        self.index = None
+
+    def add(self, vectors, keys: List[str]) -> None:
+        if faiss is not None:
+            if self.index is None:
+                self.index = faiss.IndexFlatIP(vectors.shape[1])
+            self.index.add(vectors)
+        else:
+            self.matrix = vectors if self.matrix is None else np.vstack([self.matrix, vectors])
+        self.keys.extend(keys)
+
+    def best(self, query) -> Tuple[float, str]:
+        """Score and cache key of the closest stored transcript."""
+        if self.index is not None:
+            scores, ids = self.index.search(query[np.newaxis, :], 1)
+            return float(scores[0][0]), self.keys[int(ids[0][0])]
+        scores = self.matrix @ query
+        idx = int(np.argmax(scores))
+        return float(scores[idx]), self.keys[idx]
+
+
+class SemanticIndex:
+    """
+    Keeps normalized embeddings of past transcripts and finds the closest one.
+
+    Embeddings come from a small local sentence-transformers model, so lookups
+    never leave the machine. Entries only match within the same (model, mode, date),
+    and each scope has its own index. With a directory the entries are appended to a
+    log there, so they survive restarts (and CLI runs) along with a disk/redis response backend.
+    """
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", threshold: float = 0.92, directory: Optional[str] = None):
+        if np is None:
+            raise RuntimeError("Semantic cache requires numpy")
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise RuntimeError("Semantic cache requires: pip install sentence-transformers")
+
+        self.encoder = SentenceTransformer(model_name)
+        self.threshold = threshold
+        self._scopes: Dict[str, _ScopeIndex] = {}
+        self._lock = threading.Lock()
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+
+    def _path(self) -> str:
+        return os.path.join(self.directory, "index.jsonl")
+
+    def _load(self) -> None:
+        """Reads the entry log: one JSON line per stored transcript."""
+        try:
+            with open(self._path(), "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            # A line cut short by an interrupted append; drop it so the next one starts clean
+            try:
+                os.truncate(self._path(), complete)
+            except OSError as e:
+                print(f"[!] Warning: Failed to repair semantic cache index: {e}")
+
+        grouped: Dict[str, Tuple[list, List[str]]] = {}
+        for line in data[:complete].splitlines():
+            try:
+                entry = json.loads(line)
+                vector = np.frombuffer(base64.b64decode(entry["vector"]), dtype=np.float32)
+            except (ValueError, KeyError, TypeError):
+                continue
+            vectors, keys = grouped.setdefault(entry["scope"], ([], []))
+            vectors.append(vector)
+            keys.append(entry["key"])
+        for scope, (vectors, keys) in grouped.items():
+            self._scopes.setdefault(scope, _ScopeIndex()).add(np.vstack(vectors), keys)
+
+    def _append(self, scope: str, key: str, vector) -> None:
+        """Appends one entry to the log (O(1) per store), under self._lock."""
+        line = json.dumps({
+            "scope": scope,
+            "key": key,
+            "vector": base64.b64encode(vector.tobytes()).decode("ascii"),
+        })
+        try:
+            with open(self._path(), "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"[!] Warning: Failed to persist semantic cache entry: {e}")
+
+    def _embed(self, text: str):
+        vector = self.encoder.encode(text, normalize_embeddings=True)
+        return np.asarray(vector, dtype=np.float32)
+
+    def lookup(self, scope: str, text: str) -> Optional[str]:
+        """Return the cache key of the most similar stored transcript in scope, if above threshold."""
+        query = self._embed(text)
+        with self._lock:
+            index = self._scopes.get(scope)
+            if index is None:
+                return None
+            score, key = index.best(query)
+        return key if score >= self.threshold else None
+
+    def add(self, scope: str, text: str, key: str) -> None:
+        vector = self._embed(text)
+        with self._lock:
+            self._scopes.setdefault(scope, _ScopeIndex()).add(vector[np.newaxis, :], [key])
+            if self.directory:
+                self._append(scope, key, vector)
+
+
+class LLMCache:
+    """Exact-match summary cache over a pluggable backend, with an optional semantic tier."""
+
+    def __init__(self, backend=None, ttl: int = 3600, semantic: Optional[SemanticIndex] = None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self.semantic = semantic
+
+    @staticmethod
+    def cache_key(
+        model: str,
+        mode: str,
+        transcript: str,
+        meeting_datetime: Optional[datetime] = None,
+        provider: str = "",
+        prompt: str = "",
+    ) -> str:
+        """Stable sha256 key for a summarization request (prompt text included, so edits invalidate)."""
+        payload = {
+            "provider": provider,
+            "model": model,
+            "mode": mode,
+            "prompt": prompt,
+            "transcript": transcript,
+            "meeting_datetime": meeting_datetime.isoformat() if meeting_datetime else None,
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        return self.backend.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        self.backend.set(key, value, self.ttl)
+
+
+class CachingProvider(LLMProvider):
+    """Wraps a real provider and serves repeated (or near-duplicate) transcripts from LLMCache."""
+
+    def __init__(self, provider: LLMProvider, cache: LLMCache):
+        # LLMProvider.__init__ is skipped on purpose: the wrapped provider owns
+        # api_key/model_name (Gemini may switch models on fallback).
+        self.provider = provider
+        self.cache = cache
+
+    @property
+    def api_key(self) -> str:
+        return self.provider.api_key
+
+    @property
+    def model_name(self) -> str:
+        return self.provider.model_name
+
+    def _lookup(self, transcript: str, meeting_datetime: Optional[datetime], mode: str) -> Tuple[str, str, Optional[str]]:
+        prompt_instance = PromptManager.get_prompt(mode)
+        prompt = prompt_instance.get_system_prompt() + prompt_instance.get_user_prompt_template()
+        provider = self.provider.display_name
+        key = self.cache.cache_key(self.model_name, mode, transcript, meeting_datetime, provider, prompt)
+        scope = self.cache.cache_key(self.model_name, mode, "", meeting_datetime, provider, prompt)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            print("[+] Summary served from cache (exact match)")
+            return key, scope, cached
+
+        if self.cache.semantic is not None:
+            similar_key = self.cache.semantic.lookup(scope, transcript)
+            if similar_key is not None:
+                cached = self.cache.get(similar_key)
+                if cached is not None:
+                    print("[+] Summary served from cache (similar transcript)")
+                    return key, scope, cached
+
+        return key, scope, None
+
+    def _store(self, key: str, scope: str, transcript: str, summary: str) -> None:
+        self.cache.set(key, summary)
+        if self.cache.semantic is not None:
+            self.cache.semantic.add(scope, transcript, key)
+
+    def summarize(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> str:
+        key, scope, cached = self._lookup(transcript, meeting_datetime, mode)
+        if cached is not None:
+            return cached
+
+        summary = self.provider.summarize(transcript, meeting_datetime=meeting_datetime, mode=mode)
+        if summary:
+            self._store(key, scope, transcript, summary)
+        return summary
+
+    async def asummarize(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> str:
+        # Backend/embedding calls may block (disk, redis, sentence-transformers)
+        key, scope, cached = await asyncio.to_thread(self._lookup, transcript, meeting_datetime, mode)
+        if cached is not None:
+            return cached
+
+        with track_backup_answers() as backups:
+            summary = await self.provider.asummarize(transcript, meeting_datetime=meeting_datetime, mode=mode)
+        # The key names the primary provider/model: a hedge backup's answer isn't cached under it
+        if summary and not backups:
+            await asyncio.to_thread(self._store, key, scope, transcript, summary)
+        return summary
+
+    def stream_summary(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> Iterator[str]:
+        key, scope, cached = self._lookup(transcript, meeting_datetime, mode)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        for chunk in self.provider.stream_summary(transcript, meeting_datetime=meeting_datetime, mode=mode):
+            parts.append(chunk)
+            yield chunk
+        # Only a fully received summary is cached
+        if parts:
+            self._store(key, scope, transcript, "".join(parts))
+
+    async def astream_summary(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> AsyncIterator[str]:
+        key, scope, cached = await asyncio.to_thread(self._lookup, transcript, meeting_datetime, mode)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        async for chunk in self.provider.astream_summary(transcript, meeting_datetime=meeting_datetime, mode=mode):
+            parts.append(chunk)
+            yield chunk
+        if parts:
+            await asyncio.to_thread(self._store, key, scope, transcript, "".join(parts))
+
+    def _complete(self, system_prompt: str, user_prompt: str) -> str:
+        return self.provider._complete(system_prompt, user_prompt)
+
+    async def _acomplete(self, system_prompt: str, user_prompt: str) -> str:
+        return await self.provider._acomplete(system_prompt, user_prompt)
+
+
+_SHARED_CACHES: Dict[str, LLMCache] = {}
+_SHARED_CACHES_LOCK = threading.Lock()
+
+
+def get_shared_cache(settings: Dict[str, Any]) -> Optional[LLMCache]:
+    """
+    Return a process-wide LLMCache for the given settings (None if caching is disabled).
+
+    Providers are created per request in the API, so the cache must outlive them.
+    """
+    if not settings.get("enabled", False):
+        return None
+
+    settings_key = json.dumps(settings, sort_keys=True)
+    with _SHARED_CACHES_LOCK:
+        if settings_key in _SHARED_CACHES:
+            return _SHARED_CACHES[settings_key]
+
+        backend_type = settings.get("backend", "memory")
+        if backend_type == "disk":
+            backend = DiskBackend(settings.get("directory", os.path.join("output", ".llm_cache")))
+        elif backend_type == "redis":
+            backend = RedisBackend(settings.get("redis_url", "redis://localhost:6379/0"))
+        elif backend_type == "memory":
+            backend = MemoryBackend()
+        else:
+            raise ValueError(f"Unknown LLM cache backend: {backend_type}")
+
+        semantic = None
+        if settings.get("semantic", False):
+            try:
+                directory = settings.get("semantic_directory")
+                if directory is None and backend_type == "disk":
+                    # Next to the responses it points to; a memory backend isn't worth persisting for
+                    directory = os.path.join(settings.get("directory", os.path.join("output", ".llm_cache")), "semantic")
+                semantic = SemanticIndex(
+                    model_name=settings.get("embedding_model", "all-MiniLM-L6-v2"),
+                    threshold=settings.get("similarity_threshold", 0.92),
+                    directory=directory,
+                )
+            except Exception as e:
+                print(f"[!] Warning: Semantic LLM cache disabled: {e}")
+
+        cache = LLMCache(backend, ttl=settings.get("ttl", 3600), semantic=semantic)
+        _SHARED_CACHES[settings_key] = cache
+        return cache
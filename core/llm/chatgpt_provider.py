@@ -1,70 +1,186 @@
+import asyncio
+import json
+import re
 import time
 from datetime import datetime
-from openai import OpenAI
+from typing import AsyncIterator, Iterator, List, Optional
+from openai import APIConnectionError, AsyncOpenAI, OpenAI, RateLimitError
+from core.http_client import get_async_http_client, get_http_client
 from .base import LLMProvider
-from core.utils.prompt_manager import PromptManager
+
+# Transient failures worth retrying; SDK exception types are checked first, the message is a fallback
+_RETRYABLE_ERRORS = (RateLimitError, APIConnectionError)  # APITimeoutError is an APIConnectionError
+_RETRYABLE_RE = re.compile(r"connection|timeout|network|temporary|\b429\b|rate limit", re.IGNORECASE)
+_RATE_LIMIT_RE = re.compile(r"\b429\b|rate limit", re.IGNORECASE)
+# Batch states after which no output is coming
+_BATCH_FAILED_STATES = {"failed", "expired", "cancelled"}
 
 class ChatGPTProvider(LLMProvider):
     """Generates meeting summaries via OpenAI ChatGPT."""
 
+    display_name = "ChatGPT"
+    max_input_tokens = 128_000  # gpt-4o / gpt-4o-mini
+
     def __init__(self, api_key: str, model_name: str = "gpt-4o", max_retries: int = 3):
         super().__init__(api_key, model_name)
         self.max_retries = max_retries
-        
+
         if not api_key:
             raise ValueError("OpenAI API Key is missing.")
 
-        self.client = OpenAI(api_key=api_key)
+        self.client = OpenAI(api_key=api_key, http_client=get_http_client())
+        self.aclient = AsyncOpenAI(api_key=api_key, http_client=get_async_http_client())
 
-    def summarize(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> str:
-        """
-        Generates a summary from the transcript using ChatGPT.
-        
-        Args:
-            transcript: The meeting transcript text.
-            meeting_datetime: Optional datetime of when the meeting occurred.
-            mode: Summarization mode ("meeting", "english", "interview"). Defaults to "meeting".
-        """
-        print(f"Generating summary with ChatGPT ({self.model_name}) in {mode} mode...")
-        
-        # Get mode-specific prompt
-        prompt_instance = PromptManager.get_prompt(mode)
-        system_prompt = prompt_instance.get_system_prompt()
-        user_prompt = prompt_instance.format_user_prompt(transcript, meeting_datetime)
-        
-        # Retry with exponential backoff
+    def _complete(self, system_prompt: str, user_prompt: str) -> str:
+        response = self._create_completion(system_prompt, user_prompt, stream=False)
+        return response.choices[0].message.content
+
+    async def _acomplete(self, system_prompt: str, user_prompt: str) -> str:
+        response = await self._acreate_completion(system_prompt, user_prompt, stream=False)
+        return response.choices[0].message.content
+
+    async def _astream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        async for chunk in await self._acreate_completion(system_prompt, user_prompt, stream=True):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def _stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        for chunk in self._create_completion(system_prompt, user_prompt, stream=True):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def _create_completion(self, system_prompt: str, user_prompt: str, stream: bool):
+        """Calls the Chat Completions API with retry and exponential backoff."""
+        # Built once; every attempt sends the same list
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
         for attempt in range(self.max_retries):
             try:
-                response = self.client.chat.completions.create(
+                return self.client.chat.completions.create(
                     model=self.model_name,
-                    messages=[
+                    messages=messages,
+                    stream=stream
+                )
+
+            except Exception as e:
+                time.sleep(self._retry_delay(e, attempt))
+
+    async def _acreate_completion(self, system_prompt: str, user_prompt: str, stream: bool):
+        """Async _create_completion() on the AsyncOpenAI client."""
+        # Built once; every attempt sends the same list
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        for attempt in range(self.max_retries):
+            try:
+                return await self.aclient.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    stream=stream
+                )
+
+            except Exception as e:
+                await asyncio.sleep(self._retry_delay(e, attempt))
+
+    def submit_batch(
+        self,
+        transcripts: List[str],
+        mode: str = "meeting",
+        meeting_datetimes: Optional[List[datetime]] = None,
+    ) -> str:
+        """
+        Submits summaries of several transcripts as one OpenAI Batch API job.
+
+        Batch jobs cost half as much as regular requests and don't use the
+        interactive rate limits, but complete within a 24h window rather than
+        in seconds. Use them only for offline work, such as re-summarizing
+        archived meetings. Collect the results with poll_batch().
+
+        Returns:
+            The batch id.
+        """
+        lines = []
+        for index, transcript in enumerate(transcripts):
+            meeting_datetime = meeting_datetimes[index] if meeting_datetimes else None
+            system_prompt, user_prompt = self._build_prompts(transcript, meeting_datetime, mode)
+            lines.append(json.dumps({
+                "custom_id": str(index),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model_name,
+                    "messages": [
                         {"role": "system", "content": system_prompt},
                         {"role": "user", "content": user_prompt},
                     ],
-                    stream=False
-                )
-                return response.choices[0].message.content
-                
-            except Exception as e:
-                error_msg = str(e)
-                
-                # Check for 402 Insufficient Balance / Quota
-                if "insufficient_quota" in error_msg or "429" in error_msg: 
-                    print(f"\n[!] OPENAI ERROR: Insufficient Quota or Balance (429/402).")
-                    print("    Please check your OpenAI billing at https://platform.openai.com/usage")
-                    print("    Or switch to Gemini by running: python main.py --setup\n")
-                    raise e
-
-                print(f"[-] ChatGPT Error: {error_msg}")
-                
-                # Check if it's a retryable error
-                is_retryable = any(keyword in error_msg.lower() for keyword in [
-                    'connection', 'timeout', 'network', 'temporary', '429', 'rate limit'
-                ])
-                
-                if attempt < self.max_retries - 1 and is_retryable:
-                    wait_time = 30 if "429" in error_msg or "rate limit" in error_msg.lower() else (2 ** attempt)
-                    print(f"[!] Attempt {attempt + 1} failed. Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                else:
-                    raise
+                },
+            }, ensure_ascii=False))
+
+        batch_file = self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        print(f"[+] Submitted batch {batch.id} with {len(transcripts)} transcripts ({mode} mode)")
+        return batch.id
+
+    def poll_batch(self, batch_id: str) -> Optional[List[Optional[str]]]:
+        """
+        Checks a batch submitted with submit_batch().
+
+        Returns:
+            None while the batch is still running, else the summaries in the order
+            the transcripts were submitted (None for requests that failed).
+        """
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status in _BATCH_FAILED_STATES:
+            raise RuntimeError(f"OpenAI batch {batch_id} {batch.status}")
+        if batch.status != "completed":
+            return None
+
+        counts = batch.request_counts
+        summaries: List[Optional[str]] = [None] * counts.total
+        if batch.output_file_id:
+            for line in self.client.files.content(batch.output_file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                result = json.loads(line)
+                response = result.get("response") or {}
+                if response.get("status_code") == 200:
+                    summaries[int(result["custom_id"])] = response["body"]["choices"][0]["message"]["content"]
+        if counts.failed:
+            print(f"[!] Batch {batch_id}: {counts.failed} of {counts.total} requests failed")
+        return summaries
+
+    def _retry_delay(self, e: Exception, attempt: int) -> float:
+        """Returns seconds to wait before the next attempt, or re-raises if the error is fatal/retries are exhausted."""
+        error_msg = str(e)
+        status = getattr(e, "status_code", None)
+
+        # Exhausted quota / balance is fatal. OpenAI reports it as a 429 too, but with
+        # code "insufficient_quota"; a plain 429 is a rate limit and is retried below
+        if status == 402 or getattr(e, "code", None) == "insufficient_quota" or "insufficient_quota" in error_msg:
+            print(f"\n[!] OPENAI ERROR: Insufficient Quota or Balance (429/402).")
+            print("    Please check your OpenAI billing at https://platform.openai.com/usage")
+            print("    Or switch to Gemini by running: python main.py --setup\n")
+            raise e
+
+        print(f"[-] ChatGPT Error: {error_msg}")
+
+        # Check if it's a retryable error
+        is_retryable = isinstance(e, _RETRYABLE_ERRORS) or bool(_RETRYABLE_RE.search(error_msg))
+
+        if attempt < self.max_retries - 1 and is_retryable:
+            rate_limited = status == 429 or isinstance(e, RateLimitError) or _RATE_LIMIT_RE.search(error_msg)
+            wait_time = self._retry_after(e, default=30) if rate_limited else self._backoff(attempt)
+            print(f"[!] Attempt {attempt + 1} failed. Retrying in {wait_time:.1f} seconds...")
+            return wait_time
+        else:
+            raise e
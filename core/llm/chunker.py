@@ -0,0 +1,209 @@
+"""Map-reduce summarization for transcripts that are too long for one LLM call."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from .base import LLMProvider
+from .cache import LLMCache
+from .hedged import track_backup_answers
+from .prompts.chunk_prompt import ChunkNotesPrompt
+from .tokenizer import CHARS_PER_TOKEN, count_tokens
+from .transcript_normalizer import normalize
+from core.utils.prompt_manager import PromptManager
+
+
+def _split_oversized(paragraph: str, max_tokens: int, model_name: Optional[str]) -> List[str]:
+    """Splits a single paragraph that is larger than max_tokens, by lines and then by length."""
+    pieces = []
+    for line in paragraph.split("\n"):
+        if count_tokens(line, model_name) <= max_tokens:
+            pieces.append(line)
+            continue
+        step = max_tokens * CHARS_PER_TOKEN
+        pieces.extend(line[i:i + step] for i in range(0, len(line), step))
+    return pieces
+
+
+def split_transcript(
+    text: str,
+    max_tokens: int = 6000,
+    overlap_tokens: int = 200,
+    model_name: Optional[str] = None,
+) -> List[str]:
+    """
+    Splits a transcript into windows of at most ~max_tokens at paragraph boundaries.
+
+    Each window after the first starts with the trailing paragraphs (up to
+    overlap_tokens) of the previous one, so context isn't lost at the seams.
+    """
+    paragraphs = []
+    for paragraph in text.split("\n\n"):
+        if not paragraph.strip():
+            continue
+        if count_tokens(paragraph, model_name) > max_tokens:
+            paragraphs.extend(_split_oversized(paragraph, max_tokens, model_name))
+        else:
+            paragraphs.append(paragraph)
+
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+    for paragraph in paragraphs:
+        tokens = count_tokens(paragraph, model_name)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            # Carry the tail of the previous window over as overlap
+            overlap: List[str] = []
+            overlap_size = 0
+            for previous in reversed(current):
+                size = count_tokens(previous, model_name)
+                if overlap_size + size > overlap_tokens:
+                    break
+                overlap.insert(0, previous)
+                overlap_size += size
+            current, current_tokens = overlap, overlap_size
+        current.append(paragraph)
+        current_tokens += tokens
+
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+class ChunkedProvider(LLMProvider):
+    """
+    Wraps a provider and summarizes long transcripts map-reduce style.
+
+    Parts are turned into notes concurrently, then the notes are summarized with
+    the normal mode prompt. Short transcripts go straight to the wrapped provider.
+    """
+
+    def __init__(self, provider: LLMProvider, settings: Dict[str, Any], cache: Optional[LLMCache] = None):
+        # Like CachingProvider, api_key/model_name are owned by the wrapped provider
+        self.provider = provider
+        self.threshold_tokens = int(settings.get("threshold_tokens", 16000))
+        self.max_tokens = int(settings.get("max_tokens", 6000))
+        self.overlap_tokens = int(settings.get("overlap_tokens", 200))
+        self.max_parallel = max(1, int(settings.get("max_parallel", 4)))
+        # Per-part notes are cached too, so re-runs of overlapping transcripts reuse them
+        self.cache = cache
+        self.notes_prompt = ChunkNotesPrompt()
+
+    @property
+    def api_key(self) -> str:
+        return self.provider.api_key
+
+    @property
+    def model_name(self) -> str:
+        return self.provider.model_name
+
+    @property
+    def display_name(self) -> str:
+        return self.provider.display_name
+
+    def _split(self, transcript: str) -> List[str]:
+        """Returns the (normalized) transcript parts, or a single-item list if it is short enough for one call."""
+        # Size the windows on what is actually sent
+        transcript = normalize(transcript)
+        if count_tokens(transcript, self.model_name) <= self.threshold_tokens:
+            return [transcript]
+        chunks = split_transcript(transcript, self.max_tokens, self.overlap_tokens, self.model_name)
+        print(f"[*] Long transcript: summarizing {len(chunks)} parts with {self.display_name} ({self.model_name})...")
+        return chunks
+
+    def _notes_prompts(self, chunk: str, index: int, total: int, mode: str):
+        final_system_prompt = PromptManager.get_prompt(mode).get_system_prompt()
+        system_prompt = self.notes_prompt.get_system_prompt(final_system_prompt)
+        user_prompt = self.notes_prompt.format_user_prompt(chunk, index, total)
+        return system_prompt, user_prompt
+
+    def _notes_key(self, chunk: str, mode: str, system_prompt: str) -> Optional[str]:
+        """
+        Cache key for the notes of one part. Like CachingProvider's, it covers the provider
+        and the prompt text; the part's position is left out, so overlapping re-runs still hit.
+        """
+        if self.cache is None:
+            return None
+        prompt = system_prompt + self.notes_prompt.format_user_prompt("{chunk}", "{index}", "{total}")
+        return self.cache.cache_key(self.model_name, f"notes:{mode}", chunk, provider=self.display_name, prompt=prompt)
+
+    def _chunk_notes(self, chunk: str, index: int, total: int, mode: str) -> str:
+        system_prompt, user_prompt = self._notes_prompts(chunk, index, total, mode)
+        key = self._notes_key(chunk, mode, system_prompt)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        notes = self.provider._complete(system_prompt, user_prompt)
+        if key is not None and notes:
+            self.cache.set(key, notes)
+        return notes
+
+    async def _achunk_notes(self, chunk: str, index: int, total: int, mode: str, semaphore: asyncio.Semaphore) -> str:
+        system_prompt, user_prompt = self._notes_prompts(chunk, index, total, mode)
+        key = self._notes_key(chunk, mode, system_prompt)
+        if key is not None:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached
+
+        async with semaphore:
+            with track_backup_answers() as backups:
+                notes = await self.provider._acomplete(system_prompt, user_prompt)
+        if key is not None and notes and not backups:
+            await asyncio.to_thread(self.cache.set, key, notes)
+        return notes
+
+    def _map(self, chunks: List[str], mode: str) -> str:
+        """Runs the map step in worker threads and returns the combined notes."""
+        total = len(chunks)
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel, total)) as pool:
+            notes = list(pool.map(
+                lambda item: self._chunk_notes(item[1], item[0], total, mode),
+                enumerate(chunks, start=1)
+            ))
+        return self.notes_prompt.combine_notes(notes)
+
+    async def _amap(self, chunks: List[str], mode: str) -> str:
+        """Async _map(): all parts in flight at once, bounded by max_parallel."""
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        total = len(chunks)
+        notes = await asyncio.gather(*[
+            self._achunk_notes(chunk, index, total, mode, semaphore)
+            for index, chunk in enumerate(chunks, start=1)
+        ])
+        return self.notes_prompt.combine_notes(list(notes))
+
+    def summarize(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> str:
+        chunks = self._split(transcript)
+        if len(chunks) == 1:
+            return self.provider.summarize(chunks[0], meeting_datetime=meeting_datetime, mode=mode)
+        return self.provider.summarize(self._map(chunks, mode), meeting_datetime=meeting_datetime, mode=mode)
+
+    async def asummarize(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> str:
+        chunks = await asyncio.to_thread(self._split, transcript)
+        if len(chunks) == 1:
+            return await self.provider.asummarize(chunks[0], meeting_datetime=meeting_datetime, mode=mode)
+
+        combined = await self._amap(chunks, mode)
+        return await self.provider.asummarize(combined, meeting_datetime=meeting_datetime, mode=mode)
+
+    def stream_summary(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> Iterator[str]:
+        chunks = self._split(transcript)
+        # Only the final (reduce) step is streamed
+        transcript = self._map(chunks, mode) if len(chunks) > 1 else chunks[0]
+        yield from self.provider.stream_summary(transcript, meeting_datetime=meeting_datetime, mode=mode)
+
+    async def astream_summary(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> AsyncIterator[str]:
+        chunks = await asyncio.to_thread(self._split, transcript)
+        transcript = await self._amap(chunks, mode) if len(chunks) > 1 else chunks[0]
+        async for chunk in self.provider.astream_summary(transcript, meeting_datetime=meeting_datetime, mode=mode):
+            yield chunk
+
+    def _complete(self, system_prompt: str, user_prompt: str) -> str:
+        return self.provider._complete(system_prompt, user_prompt)
+
+    async def _acomplete(self, system_prompt: str, user_prompt: str) -> str:
+        return await self.provider._acomplete(system_prompt, user_prompt)
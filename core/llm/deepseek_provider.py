@@ -1,74 +1,116 @@
+import asyncio
+import re
 import time
-from datetime import datetime
-from openai import OpenAI
+from typing import AsyncIterator, Iterator
+from openai import APIConnectionError, AsyncOpenAI, OpenAI, RateLimitError
+from core.http_client import get_async_http_client, get_http_client
 from .base import LLMProvider
-from core.utils.prompt_manager import PromptManager
+
+# Transient failures worth retrying; SDK exception types are checked first, the message is a fallback
+_RETRYABLE_ERRORS = (RateLimitError, APIConnectionError)  # APITimeoutError is an APIConnectionError
+_RETRYABLE_RE = re.compile(r"connection|timeout|network|temporary|\b429\b|rate limit", re.IGNORECASE)
+_RATE_LIMIT_RE = re.compile(r"\b429\b|rate limit", re.IGNORECASE)
 
 class DeepSeekProvider(LLMProvider):
     """Generates meeting summaries via DeepSeek API (OpenAI-compatible)."""
 
+    display_name = "DeepSeek"
+    max_input_tokens = 64_000
+
     def __init__(self, api_key: str, model_name: str = "deepseek-chat", max_retries: int = 3):
         super().__init__(api_key, model_name)
         self.max_retries = max_retries
-        
+
         if not api_key:
             raise ValueError("DeepSeek API Key is missing.")
 
         # DeepSeek uses OpenAI-compatible API
         self.client = OpenAI(
             api_key=api_key,
-            base_url="https://api.deepseek.com"
+            base_url="https://api.deepseek.com",
+            http_client=get_http_client()
         )
+        self.aclient = AsyncOpenAI(
+            api_key=api_key,
+            base_url="https://api.deepseek.com",
+            http_client=get_async_http_client()
+        )
+
+    def _complete(self, system_prompt: str, user_prompt: str) -> str:
+        response = self._create_completion(system_prompt, user_prompt, stream=False)
+        return response.choices[0].message.content
+
+    async def _acomplete(self, system_prompt: str, user_prompt: str) -> str:
+        response = await self._acreate_completion(system_prompt, user_prompt, stream=False)
+        return response.choices[0].message.content
+
+    async def _astream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        async for chunk in await self._acreate_completion(system_prompt, user_prompt, stream=True):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def _stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        for chunk in self._create_completion(system_prompt, user_prompt, stream=True):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def _create_completion(self, system_prompt: str, user_prompt: str, stream: bool):
+        """Calls the Chat Completions API with retry and exponential backoff."""
+        # Built once; every attempt sends the same list
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        for attempt in range(self.max_retries):
+            try:
+                return self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    stream=stream
+                )
 
-    def summarize(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> str:
-        """
-        Generates a summary from the transcript using DeepSeek.
-        
-        Args:
-            transcript: The meeting transcript text.
-            meeting_datetime: Optional datetime of when the meeting occurred.
-            mode: Summarization mode ("meeting", "english", "interview"). Defaults to "meeting".
-        """
-        print(f"Generating summary with DeepSeek ({self.model_name}) in {mode} mode...")
-        
-        # Get mode-specific prompt
-        prompt_instance = PromptManager.get_prompt(mode)
-        system_prompt = prompt_instance.get_system_prompt()
-        user_prompt = prompt_instance.format_user_prompt(transcript, meeting_datetime)
-        
-        # Retry with exponential backoff
+            except Exception as e:
+                time.sleep(self._retry_delay(e, attempt))
+
+    async def _acreate_completion(self, system_prompt: str, user_prompt: str, stream: bool):
+        """Async _create_completion() on the AsyncOpenAI client."""
+        # Built once; every attempt sends the same list
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
         for attempt in range(self.max_retries):
             try:
-                response = self.client.chat.completions.create(
+                return await self.aclient.chat.completions.create(
                     model=self.model_name,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    stream=False
+                    messages=messages,
+                    stream=stream
                 )
-                return response.choices[0].message.content
-                
+
             except Exception as e:
-                error_msg = str(e)
-                
-                # Check for 402 Insufficient Balance
-                if "402" in error_msg or "Insufficient Balance" in error_msg:
-                    print(f"\n[!] DEEPSEEK ERROR: Insufficient Balance (402).")
-                    print("    Please top up your DeepSeek API account at https://platform.deepseek.com/")
-                    print("    Or switch to Gemini by running: python main.py --setup\n")
-                    raise e
-                    
-                print(f"[-] DeepSeek Error: {error_msg}")
-                
-                # Check if it's a retryable error
-                is_retryable = any(keyword in error_msg.lower() for keyword in [
-                    'connection', 'timeout', 'network', 'temporary', '429', 'rate limit'
-                ])
-                
-                if attempt < self.max_retries - 1 and is_retryable:
-                    wait_time = 30 if "429" in error_msg or "rate limit" in error_msg.lower() else (2 ** attempt)
-                    print(f"[!] Attempt {attempt + 1} failed. Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                else:
-                    raise
+                await asyncio.sleep(self._retry_delay(e, attempt))
+
+    def _retry_delay(self, e: Exception, attempt: int) -> float:
+        """Returns seconds to wait before the next attempt, or re-raises if the error is fatal/retries are exhausted."""
+        error_msg = str(e)
+        status = getattr(e, "status_code", None)
+
+        # Check for 402 Insufficient Balance
+        if status == 402 or "402" in error_msg or "Insufficient Balance" in error_msg:
+            print(f"\n[!] DEEPSEEK ERROR: Insufficient Balance (402).")
+            print("    Please top up your DeepSeek API account at https://platform.deepseek.com/")
+            print("    Or switch to Gemini by running: python main.py --setup\n")
+            raise e
+
+        print(f"[-] DeepSeek Error: {error_msg}")
+
+        # Check if it's a retryable error
+        is_retryable = isinstance(e, _RETRYABLE_ERRORS) or bool(_RETRYABLE_RE.search(error_msg))
+
+        if attempt < self.max_retries - 1 and is_retryable:
+            rate_limited = status == 429 or isinstance(e, RateLimitError) or _RATE_LIMIT_RE.search(error_msg)
+            wait_time = self._retry_after(e, default=30) if rate_limited else self._backoff(attempt)
+            print(f"[!] Attempt {attempt + 1} failed. Retrying in {wait_time:.1f} seconds...")
+            return wait_time
+        else:
+            raise e
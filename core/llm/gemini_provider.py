@@ -1,7 +1,12 @@
+import asyncio
+import re
 import time
-from datetime import datetime
+from typing import AsyncIterator, Iterator, List, Optional, Union
+
+import httpx
+
+from core.http_client import HTTP2_AVAILABLE
 from .base import LLMProvider
-from core.utils.prompt_manager import PromptManager
 
 try:
     # Try new google.genai first
@@ -13,9 +18,24 @@ except ImportError:
     import google.generativeai as genai
     USE_NEW_API = False
 
+# Gemini only accepts explicit context caches above ~1024 tokens (~4 chars per token)
+CONTEXT_CACHE_MIN_CHARS = 4096
+CONTEXT_CACHE_TTL = 3600
+
+# Transient failures worth retrying. google.genai and google.api_core errors carry the HTTP
+# status in .code and google.genai's transport errors are httpx's; the message is a fallback
+_RETRYABLE_STATUS = frozenset((429, 500, 502, 503, 504))
+_RETRYABLE_ERRORS = (httpx.TransportError,)  # connect/read timeouts, dropped connections
+_RETRYABLE_RE = re.compile(r"connection|timeout|network|temporary|\b429\b|quota", re.IGNORECASE)
+# Request failed because the context cache it referenced is gone
+_CACHE_GONE_RE = re.compile(r"404|cached ?content", re.IGNORECASE)
+
 class GeminiProvider(LLMProvider):
     """Generates meeting summaries via Google Gemini."""
 
+    display_name = "Gemini"
+    max_input_tokens = 1_048_576
+
     def __init__(self, api_key: str, model_name: str = "gemini-2.0-flash", max_retries: int = 3):
         super().__init__(api_key, model_name)
         self.max_retries = max_retries
@@ -25,108 +45,315 @@ class GeminiProvider(LLMProvider):
 
         if USE_NEW_API:
             # New google.genai API
-            self.client = genai.Client(api_key=api_key)
+            self.client = self._create_client(api_key)
+            # (model, system_prompt) -> (cached content name or None, refresh_at)
+            self._context_caches = {}
         else:
             # Legacy google.generativeai API
             genai.configure(api_key=api_key)
+            # model name -> GenerativeModel, built on first use
+            self._legacy_models = {}
+
+    @staticmethod
+    def _create_client(api_key: str):
+        """google.genai client, multiplexing concurrent async requests over HTTP/2 when h2 is installed."""
+        if HTTP2_AVAILABLE:
             try:
-                self.model = genai.GenerativeModel(self.model_name)
-            except Exception:
-                # Fallback handled in summarize if model is invalid/unavailable
+                return genai.Client(
+                    api_key=api_key,
+                    http_options=types.HttpOptions(async_client_args={"http2": True})
+                )
+            except (TypeError, ValueError, AttributeError):
+                # Older google-genai without async_client_args
                 pass
+        return genai.Client(api_key=api_key)
+
+    def _complete(self, system_prompt: str, user_prompt: str) -> str:
+        return self._generate(system_prompt, user_prompt, stream=False)
+
+    def _stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        yield from self._generate(system_prompt, user_prompt, stream=True)
 
-    def summarize(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> str:
+    @staticmethod
+    def _prefetch(chunks) -> Iterator[str]:
+        """Pulls the first chunk right away so request errors surface inside the retry loop."""
+        iterator = iter(chunks)
+        first = next(iterator, None)
+
+        def texts():
+            if first is not None and first.text:
+                yield first.text
+            for chunk in iterator:
+                if chunk.text:
+                    yield chunk.text
+
+        return texts()
+
+    def _system_config(self, system_prompt: str, model: str):
+        """GenerateContentConfig for the system prompt, served from a context cache when it's large enough."""
+        cached_name = self._context_cache_name(system_prompt, model)
+        if cached_name:
+            return types.GenerateContentConfig(cached_content=cached_name)
+        return types.GenerateContentConfig(system_instruction=system_prompt)
+
+    def _context_cache_name(self, system_prompt: str, model: str) -> Optional[str]:
         """
-        Generates a summary from the transcript using Gemini with retry logic.
-        
-        Args:
-            transcript: The meeting transcript text.
-            meeting_datetime: Optional datetime of when the meeting occurred.
-            mode: Summarization mode ("meeting", "english", "interview"). Defaults to "meeting".
+        Registers the static system prompt as Gemini cached content (once per model
+        and TTL), so its tokens are processed and billed once instead of per request.
+        """
+        if len(system_prompt) < CONTEXT_CACHE_MIN_CHARS:
+            return None
+
+        key = (model, system_prompt)
+        now = time.time()
+        entry = self._context_caches.get(key)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+        try:
+            cache = self.client.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=system_prompt,
+                    ttl=f"{CONTEXT_CACHE_TTL}s"
+                )
+            )
+            name = cache.name
+        except Exception as e:
+            print(f"[!] Gemini context caching unavailable, sending system prompt inline: {e}")
+            name = None
+        # Refresh shortly before the server-side TTL runs out (failures are retried after the same period)
+        self._context_caches[key] = (name, now + CONTEXT_CACHE_TTL - 60)
+        return name
+
+    def _drop_expired_context_cache(self, e: Exception, system_prompt: str, model: str) -> bool:
+        """
+        Forgets the context cache for this prompt if the request failed because it
+        no longer exists server-side (deleted or expired early). Returns True if dropped.
+        """
+        entry = self._context_caches.get((model, system_prompt))
+        if entry is None or entry[0] is None:
+            return False
+        if _CACHE_GONE_RE.search(str(e)):
+            print(f"[!] Gemini context cache {entry[0]} is gone, recreating it")
+            self._context_caches.pop((model, system_prompt), None)
+            return True
+        return False
+
+    @staticmethod
+    def _inline_prompt(system_prompt: str, user_prompt: str) -> List[str]:
+        """
+        System and user prompt as parts of one user turn, for calls without system_instruction.
+        Both SDKs send them as-is, so the transcript isn't copied into a combined string.
+        """
+        return [system_prompt + "\n\n", user_prompt]
+
+    def _call_new_api(self, model: str, contents: Union[str, List[str]], config, stream: bool):
+        """Single google.genai request; returns text, or a chunk iterator if stream=True."""
+        if stream:
+            return self._prefetch(self.client.models.generate_content_stream(
+                model=model,
+                contents=contents,
+                config=config
+            ))
+        response = self.client.models.generate_content(
+            model=model,
+            contents=contents,
+            config=config
+        )
+        return response.text
+
+    def _generate(self, system_prompt: str, user_prompt: str, stream: bool = False):
+        """
+        Calls Gemini with retry logic.
+
+        Returns the response text, or an iterator of text chunks if stream=True.
         """
-        print(f"Generating summary with Gemini ({self.model_name}) in {mode} mode...")
-        
-        # Get mode-specific prompt
-        prompt_instance = PromptManager.get_prompt(mode)
-        system_prompt = prompt_instance.get_system_prompt()
-        user_prompt = prompt_instance.format_user_prompt(transcript, meeting_datetime)
-        
         # Combine system and user prompts for Gemini
         # For Gemini, we can include system instruction in the prompt or use system_instruction parameter if available
-        full_prompt = f"{system_prompt}\n\n{user_prompt}"
+        full_prompt = self._inline_prompt(system_prompt, user_prompt)
+        # Model for this call only: the provider is shared, so a fallback must not stick to it
+        model = self.model_name
         
-        # Retry with exponential backoff
-        for attempt in range(self.max_retries):
+        # Retry with exponential backoff; a switch to the fallback model, or one recreation of a
+        # context cache that's gone, retries right away without using up an attempt
+        attempt = 0
+        cache_recreated = False
+        while attempt < self.max_retries:
             try:
                 if USE_NEW_API:
                     # New API
                     try:
                         # Try with system_instruction parameter if available
                         try:
-                            response = self.client.models.generate_content(
-                                model=self.model_name,
-                                contents=user_prompt,
-                                config=types.GenerateContentConfig(
-                                    system_instruction=system_prompt
-                                )
+                            return self._call_new_api(
+                                model,
+                                user_prompt,
+                                self._system_config(system_prompt, model),
+                                stream
                             )
-                            return response.text
                         except (TypeError, AttributeError):
                             # Fallback: include system prompt in contents if system_instruction not supported
-                            response = self.client.models.generate_content(
-                                model=self.model_name,
-                                contents=full_prompt
-                            )
-                            return response.text
+                            return self._call_new_api(model, full_prompt, None, stream)
                     except Exception as e:
-                        error_str = str(e)
-                        # 404 or 429 Handle - specific fallback logic for Gemini 2.0 Flash
-                        if (("404" in error_str) or ("429" in error_str)) and self.model_name == 'gemini-2.0-flash':
-                            print(f"[!] Gemini 2.0 Flash issue, falling back to gemini-flash-latest")
-                            # Create a temporary fallback instance or just change model name
-                            # Changing model name locally for retry
-                            self.model_name = 'gemini-flash-latest'
-                            return self.summarize(transcript, meeting_datetime, mode)
-                        
-                        # If even fallback is exhausted, we need to wait
-                        if "429" in error_str:
-                            print(f"[!] Quota exceeded for {self.model_name}. Waiting 30s...")
-                            time.sleep(30)
+                        if self._drop_expired_context_cache(e, system_prompt, model) and not cache_recreated:
+                            # Retry right away with a freshly created cache
+                            cache_recreated = True
+                            continue
+                        fallback = self._fallback_model(e, model)
+                        if fallback:
+                            model = fallback
+                            continue
+
+                        # If even fallback is exhausted, _retry_delay waits as long as the server asks
+                        if "429" in str(e):
+                            print(f"[!] Quota exceeded for {model}.")
                         raise
                 else:
-                    # Legacy API
-                    # Ensure model is initialized with current model_name
-                    if not hasattr(self, 'model') or self.model.model_name != f"models/{self.model_name}" and self.model.model_name != self.model_name:
-                         self.model = genai.GenerativeModel(self.model_name)
-
                     try:
                         # Legacy API: include system prompt in the content
-                        response = self.model.generate_content(full_prompt)
-                        return response.text
+                        response = self._legacy_model(model).generate_content(full_prompt, stream=stream)
+                        return self._prefetch(response) if stream else response.text
                     except Exception as e:
-                         # Fallback for legacy if 2.0 fails
-                        if "404" in str(e) and self.model_name == 'gemini-2.0-flash':
-                             print(f"[!] Gemini 2.0 Flash stable not available, trying 1.5 flash")
-                             self.model_name = 'gemini-1.5-flash'
-                             self.model = genai.GenerativeModel(self.model_name)
-                             # Retry immediately
-                             continue
+                        fallback = self._legacy_fallback_model(e, model)
+                        if fallback:
+                            # Retry immediately
+                            model = fallback
+                            continue
                         raise e
 
             except Exception as e:
-                error_msg = str(e)
-                
-                # Check if it's a retryable error
-                is_retryable = any(keyword in error_msg.lower() for keyword in [
-                    'connection', 'timeout', 'network', 'temporary', '429', 'quota'
-                ])
-                
-                if attempt < self.max_retries - 1 and is_retryable:
-                    # Increase wait time for quota errors
-                    wait_time = 30 if "429" in error_msg else (2 ** attempt)
-                    print(f"[!] Attempt {attempt + 1} failed: {error_msg}")
-                    print(f"    Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
+                time.sleep(self._retry_delay(e, attempt))
+                attempt += 1
+
+    async def _acomplete(self, system_prompt: str, user_prompt: str) -> str:
+        return await self._agenerate(system_prompt, user_prompt, stream=False)
+
+    async def _astream(self, system_prompt: str, user_prompt: str) -> AsyncIterator[str]:
+        chunks = await self._agenerate(system_prompt, user_prompt, stream=True)
+        async for chunk in chunks:
+            yield chunk
+
+    @staticmethod
+    async def _aprefetch(chunks) -> AsyncIterator[str]:
+        """Async _prefetch(): awaits the first chunk so request errors surface inside the retry loop."""
+        iterator = chunks.__aiter__()
+        first = await anext(iterator, None)
+
+        async def texts():
+            if first is not None and first.text:
+                yield first.text
+            async for chunk in iterator:
+                if chunk.text:
+                    yield chunk.text
+
+        return texts()
+
+    async def _acall_new_api(self, model: str, contents: Union[str, List[str]], config, stream: bool):
+        """Async _call_new_api() via client.aio."""
+        if stream:
+            return await self._aprefetch(await self.client.aio.models.generate_content_stream(
+                model=model,
+                contents=contents,
+                config=config
+            ))
+        response = await self.client.aio.models.generate_content(
+            model=model,
+            contents=contents,
+            config=config
+        )
+        return response.text
+
+    async def _agenerate(self, system_prompt: str, user_prompt: str, stream: bool = False):
+        """Async counterpart of _generate(), using the SDKs' native async calls."""
+        full_prompt = self._inline_prompt(system_prompt, user_prompt)
+        model = self.model_name
+
+        attempt = 0
+        cache_recreated = False
+        while attempt < self.max_retries:
+            try:
+                if USE_NEW_API:
+                    try:
+                        try:
+                            return await self._acall_new_api(
+                                model,
+                                user_prompt,
+                                await asyncio.to_thread(self._system_config, system_prompt, model),
+                                stream
+                            )
+                        except (TypeError, AttributeError):
+                            return await self._acall_new_api(model, full_prompt, None, stream)
+                    except Exception as e:
+                        if self._drop_expired_context_cache(e, system_prompt, model) and not cache_recreated:
+                            cache_recreated = True
+                            continue
+                        fallback = self._fallback_model(e, model)
+                        if fallback:
+                            model = fallback
+                            continue
+
+                        if "429" in str(e):
+                            print(f"[!] Quota exceeded for {model}.")
+                        raise
                 else:
-                    print(f"[-] LLM Error after {attempt + 1} attempts: {e}")
-                    raise
+                    try:
+                        response = await self._legacy_model(model).generate_content_async(full_prompt, stream=stream)
+                        return await self._aprefetch(response) if stream else response.text
+                    except Exception as e:
+                        fallback = self._legacy_fallback_model(e, model)
+                        if fallback:
+                            model = fallback
+                            continue
+                        raise e
+
+            except Exception as e:
+                await asyncio.sleep(self._retry_delay(e, attempt))
+                attempt += 1
+
+    @staticmethod
+    def _fallback_model(e: Exception, model: str) -> Optional[str]:
+        """404 or 429 on Gemini 2.0 Flash (new API): gemini-flash-latest for the retry, else None."""
+        error_str = str(e)
+        if (("404" in error_str) or ("429" in error_str)) and model == 'gemini-2.0-flash':
+            print(f"[!] Gemini 2.0 Flash issue, falling back to gemini-flash-latest")
+            return 'gemini-flash-latest'
+        return None
+
+    @staticmethod
+    def _legacy_fallback_model(e: Exception, model: str) -> Optional[str]:
+        """Fallback for legacy API if 2.0 fails."""
+        if "404" in str(e) and model == 'gemini-2.0-flash':
+            print(f"[!] Gemini 2.0 Flash stable not available, trying 1.5 flash")
+            return 'gemini-1.5-flash'
+        return None
+
+    def _legacy_model(self, model: str):
+        """Legacy GenerativeModel for the given model name, built once."""
+        generative_model = self._legacy_models.get(model)
+        if generative_model is None:
+            generative_model = self._legacy_models[model] = genai.GenerativeModel(model)
+        return generative_model
+
+    def _retry_delay(self, e: Exception, attempt: int) -> float:
+        """Returns seconds to wait before the next attempt, or re-raises if retries are exhausted."""
+        error_msg = str(e)
+        status = getattr(e, "code", None)
+        rate_limited = status == 429 or "429" in error_msg
+        
+        # Check if it's a retryable error
+        is_retryable = (
+            status in _RETRYABLE_STATUS
+            or isinstance(e, _RETRYABLE_ERRORS)
+            or bool(_RETRYABLE_RE.search(error_msg))
+        )
+        
+        if attempt < self.max_retries - 1 and is_retryable:
+            # Increase wait time for quota errors
+            wait_time = self._retry_after(e, default=30) if rate_limited else self._backoff(attempt)
+            print(f"[!] Attempt {attempt + 1} failed: {error_msg}")
+            print(f"    Retrying in {wait_time:.1f} seconds...")
+            return wait_time
+        else:
+            print(f"[-] LLM Error after {attempt + 1} attempts: {e}")
+            raise e
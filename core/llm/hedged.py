@@ -0,0 +1,115 @@
+"""Hedged requests: ask a backup provider when the primary is slow, keep whichever answers first."""
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import AsyncIterator, Iterator, List, Optional
+
+from .base import LLMProvider
+
+# Backups that won hedged calls in the current track_backup_answers() block
+_backup_answers: ContextVar[Optional[List[LLMProvider]]] = ContextVar("backup_answers", default=None)
+
+
+@contextmanager
+def track_backup_answers():
+    """
+    Collects the backup providers that answered hedged calls made inside the block.
+
+    Callers that cache answers under the primary's name use it to skip answers that
+    came from another model. Tasks started inside the block report into the same list,
+    and a nested block reports to the enclosing one too.
+    """
+    outer = _backup_answers.get()
+    answered: List[LLMProvider] = []
+    token = _backup_answers.set(answered)
+    try:
+        yield answered
+    finally:
+        _backup_answers.reset(token)
+        if outer is not None:
+            outer.extend(answered)
+
+
+class HedgedProvider(LLMProvider):
+    """
+    Wraps a primary provider and backups for async calls.
+
+    If the primary hasn't answered within delay_ms, the next provider is asked as
+    well; the first successful answer wins and the other calls are cancelled.
+    A failed call starts the next provider right away. Sync and streaming calls
+    only use the primary (blocking threads can't be cancelled).
+    """
+
+    def __init__(self, providers: List[LLMProvider], delay_ms: int = 3000):
+        # Like CachingProvider, api_key/model_name are owned by the wrapped (primary) provider
+        self.providers = providers
+        self.delay = max(0, delay_ms) / 1000
+
+    @property
+    def primary(self) -> LLMProvider:
+        return self.providers[0]
+
+    @property
+    def api_key(self) -> str:
+        return self.primary.api_key
+
+    @property
+    def model_name(self) -> str:
+        return self.primary.model_name
+
+    @property
+    def display_name(self) -> str:
+        return self.primary.display_name
+
+    async def _hedge(self, call):
+        waiting = list(self.providers)
+        pending = {}
+        last_error = None
+        try:
+            while waiting or pending:
+                if waiting:
+                    provider = waiting.pop(0)
+                    if provider is not self.primary:
+                        print(f"[*] Hedging: also asking {provider.display_name} ({provider.model_name})...")
+                    pending[asyncio.ensure_future(call(provider))] = provider
+
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.delay if waiting else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is None:
+                        answered = _backup_answers.get()
+                        if provider is not self.primary and answered is not None:
+                            answered.append(provider)
+                        return task.result()
+                    last_error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error
+
+    def summarize(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> str:
+        return self.primary.summarize(transcript, meeting_datetime=meeting_datetime, mode=mode)
+
+    async def asummarize(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> str:
+        return await self._hedge(
+            lambda provider: provider.asummarize(transcript, meeting_datetime=meeting_datetime, mode=mode)
+        )
+
+    def stream_summary(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> Iterator[str]:
+        yield from self.primary.stream_summary(transcript, meeting_datetime=meeting_datetime, mode=mode)
+
+    async def astream_summary(self, transcript: str, meeting_datetime: datetime = None, mode: str = "meeting") -> AsyncIterator[str]:
+        async for chunk in self.primary.astream_summary(transcript, meeting_datetime=meeting_datetime, mode=mode):
+            yield chunk
+
+    def _complete(self, system_prompt: str, user_prompt: str) -> str:
+        return self.primary._complete(system_prompt, user_prompt)
+
+    async def _acomplete(self, system_prompt: str, user_prompt: str) -> str:
+        # Used by the map step of chunked summarization
+        return await self._hedge(lambda provider: provider._acomplete(system_prompt, user_prompt))
@@ -4,10 +4,12 @@ from .base_prompt import BasePrompt
 from .meeting_prompt import MeetingPrompt
 from .english_prompt import EnglishPrompt
 from .interview_prompt import InterviewPrompt
+from .chunk_prompt import ChunkNotesPrompt
 
 __all__ = [
     "BasePrompt",
     "MeetingPrompt",
     "EnglishPrompt",
     "InterviewPrompt",
+    "ChunkNotesPrompt",
 ]
@@ -1,10 +1,33 @@
 """Abstract base class for prompt templates."""
+import string
 from abc import ABC, abstractmethod
 from datetime import datetime
+from typing import Dict, Optional, Type
+
+# Summarization mode -> prompt class, filled in as the mode modules are imported
+MODE_REGISTRY: Dict[str, Type["BasePrompt"]] = {}
 
 
 class BasePrompt(ABC):
-    """Abstract base class defining the interface for all prompt templates."""
+    """
+    Abstract base class defining the interface for all prompt templates.
+
+    Subclasses declared with a mode (class MeetingPrompt(BasePrompt, mode="meeting"))
+    register themselves for PromptManager.
+    """
+
+    def __init_subclass__(cls, mode: Optional[str] = None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if mode is not None:
+            MODE_REGISTRY[mode] = cls
+
+    def __init__(self):
+        # (literal_text, field_name) pairs parsed once, so formatting is a single join;
+        # a tuple, since PromptManager shares one instance per mode
+        self._segments = tuple(
+            (literal, field)
+            for literal, field, _, _ in string.Formatter().parse(self.get_user_prompt_template())
+        )
 
     @abstractmethod
     def get_system_prompt(self) -> str:
@@ -22,8 +45,13 @@ class BasePrompt(ABC):
         Returns the user prompt template string.
         
         This template should include placeholders for:
-        - {date_str}: Meeting date/time string
         - {transcript}: The transcript content
+        - {date_str}: Meeting date/time string
+        
+        The transcript goes first and the date last: the system prompt and the
+        transcript then form a stable prefix that the providers' prompt caching
+        can reuse when the same transcript is summarized again (the date
+        defaults to the current time, so it changes on every run).
         
         Returns:
             User prompt template string with placeholders.
@@ -46,7 +74,13 @@ class BasePrompt(ABC):
         else:
             date_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        return self.get_user_prompt_template().format(
-            date_str=date_str,
-            transcript=transcript
-        )
+        return self.render_user(date_str=date_str, transcript=transcript)
+
+    def render_user(self, **values: str) -> str:
+        """Renders the user prompt template with the given field values, using the segments parsed in __init__."""
+        parts = []
+        for literal, field in self._segments:
+            parts.append(literal)
+            if field is not None:
+                parts.append(values[field])
+        return "".join(parts)
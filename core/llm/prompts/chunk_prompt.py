@@ -0,0 +1,44 @@
+"""Prompts for the map step of long-transcript (chunked) summarization."""
+import functools
+from typing import List
+
+
+@functools.lru_cache(maxsize=8)
+def _notes_system_prompt(final_system_prompt: str) -> str:
+    # Rendered once per mode instead of once per part
+    return f"""You are an expert meeting assistant. You receive one part of a long transcript at a time.
+Extract everything needed to write the final summary later: discussion topics, decisions, action items with owners and deadlines, open questions and notable facts or numbers.
+Keep speaker labels and [MM:SS] timestamps. Be concise and do not invent information. Write the notes in the language of the transcript.
+
+The final summary will be written with these instructions:
+{final_system_prompt}"""
+
+
+class ChunkNotesPrompt:
+    """Extracts compact notes from one part of a long transcript; the notes are summarized afterwards."""
+
+    def get_system_prompt(self, final_system_prompt: str) -> str:
+        """
+        Returns the system prompt for the map step.
+
+        Args:
+            final_system_prompt: System prompt of the selected mode, so the notes keep what it needs.
+        """
+        return _notes_system_prompt(final_system_prompt)
+
+    def format_user_prompt(self, chunk: str, index: int, total: int) -> str:
+        """Formats the user prompt for part `index` (1-based) of `total`."""
+        return f"""Transcript part {index} of {total}:
+{chunk}
+
+Return the notes for this part as a Markdown bullet list."""
+
+    @staticmethod
+    def combine_notes(notes: List[str]) -> str:
+        """Joins per-part notes into the text used as the transcript for the final (reduce) step."""
+        parts = [f"### Part {i}\n{note.strip()}" for i, note in enumerate(notes, start=1)]
+        header = (
+            "The transcript was too long to process at once, so it was split into consecutive parts. "
+            "Below are detailed notes for each part, in order; treat them as the transcript."
+        )
+        return header + "\n\n" + "\n\n".join(parts)
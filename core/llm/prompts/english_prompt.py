@@ -1,13 +1,7 @@
 """English lesson mode prompt template."""
 from .base_prompt import BasePrompt
 
-
-class EnglishPrompt(BasePrompt):
-    """Prompt template for English lesson summarization."""
-
-    def get_system_prompt(self) -> str:
-        """Returns the system prompt for English lesson mode."""
-        return """You are an expert English language learning assistant. Analyze the English lesson transcript and provide a structured summary in Russian.
+_ENGLISH_SYSTEM = """You are an expert English language learning assistant. Analyze the English lesson transcript and provide a structured summary in Russian.
 
 IMPORTANT AUDIO CHANNEL MAPPING:
 - Channels 1-2: Teacher's audio (feedback, explanations, corrections)
@@ -19,19 +13,12 @@ Focus on:
 - Grammar points explained or corrected
 - Homework review and assignments
 
-Structure the summary to help the student review and learn from the lesson."""
+Structure the summary to help the student review and learn from the lesson.
 
-    def get_user_prompt_template(self) -> str:
-        """Returns the user prompt template for English lesson mode."""
-        return """Lesson Date/Time: {date_str}
-
-Transcript:
-{transcript}
-
-Please provide a structured summary in Markdown format with the following sections:
+For each transcript, provide a structured summary in Markdown format with the following sections:
 
 ## Дата и время урока
-{date_str}
+(the Lesson Date/Time given in the message)
 
 ## Разбор домашнего задания (Homework Review)
 - (What homework was reviewed and teacher's feedback)
@@ -47,3 +34,20 @@ Please provide a structured summary in Markdown format with the following sectio
 
 If any section is not applicable, state "Не указано" or "Нет".
 Focus on capturing the teacher's feedback and corrections from Channels 1-2."""
+
+_ENGLISH_USER_TEMPLATE = """Transcript:
+{transcript}
+
+Lesson Date/Time: {date_str}"""
+
+
+class EnglishPrompt(BasePrompt, mode="english"):
+    """Prompt template for English lesson summarization."""
+
+    def get_system_prompt(self) -> str:
+        """Returns the system prompt for English lesson mode."""
+        return _ENGLISH_SYSTEM
+
+    def get_user_prompt_template(self) -> str:
+        """Returns the user prompt template for English lesson mode."""
+        return _ENGLISH_USER_TEMPLATE
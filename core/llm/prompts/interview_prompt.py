@@ -1,13 +1,7 @@
 """Interview mode prompt template."""
 from .base_prompt import BasePrompt
 
-
-class InterviewPrompt(BasePrompt):
-    """Prompt template for interview summarization."""
-
-    def get_system_prompt(self) -> str:
-        """Returns the system prompt for interview mode."""
-        return """You are an expert interview analysis assistant. Analyze the interview transcript and provide a detailed assessment in Russian.
+_INTERVIEW_SYSTEM = """You are an expert interview analysis assistant. Analyze the interview transcript and provide a detailed assessment in Russian.
 
 IMPORTANT AUDIO CHANNEL MAPPING:
 - Channels 1-2: Interviewer and Candidate audio (questions and answers)
@@ -19,19 +13,12 @@ Focus on:
 - Behavioral patterns and responses
 - Overall hiring recommendation
 
-Provide a comprehensive analysis that helps evaluate the candidate's fit for the position."""
+Provide a comprehensive analysis that helps evaluate the candidate's fit for the position.
 
-    def get_user_prompt_template(self) -> str:
-        """Returns the user prompt template for interview mode."""
-        return """Interview Date/Time: {date_str}
-
-Transcript:
-{transcript}
-
-Please provide a detailed interview analysis in Markdown format with the following sections:
+For each transcript, provide a detailed interview analysis in Markdown format with the following sections:
 
 ## Дата и время интервью
-{date_str}
+(the Interview Date/Time given in the message)
 
 ## Навыки кандидата (Candidate Skills)
 - (Technical skills, soft skills, and qualifications mentioned)
@@ -50,3 +37,20 @@ For each significant question:
 
 If any section is not applicable, state "Не указано" or "Нет".
 Focus on capturing detailed information from Channels 1-2 (interviewer and candidate)."""
+
+_INTERVIEW_USER_TEMPLATE = """Transcript:
+{transcript}
+
+Interview Date/Time: {date_str}"""
+
+
+class InterviewPrompt(BasePrompt, mode="interview"):
+    """Prompt template for interview summarization."""
+
+    def get_system_prompt(self) -> str:
+        """Returns the system prompt for interview mode."""
+        return _INTERVIEW_SYSTEM
+
+    def get_user_prompt_template(self) -> str:
+        """Returns the user prompt template for interview mode."""
+        return _INTERVIEW_USER_TEMPLATE
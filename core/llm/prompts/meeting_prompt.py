@@ -1,32 +1,19 @@
 """Standard meeting mode prompt template."""
 from .base_prompt import BasePrompt
 
-
-class MeetingPrompt(BasePrompt):
-    """Prompt template for standard meeting summarization."""
-
-    def get_system_prompt(self) -> str:
-        """Returns the system prompt for meeting mode."""
-        return """You are an expert meeting assistant. Analyze the meeting transcript and provide a comprehensive summary in Russian.
+_MEETING_SYSTEM = """You are an expert meeting assistant. Analyze the meeting transcript and provide a comprehensive summary in Russian.
 
 Focus on:
 - General discussion topics
 - Key decisions made
 - Action items and tasks assigned to participants
 
-The transcript may contain multiple speakers. Try to identify speakers and assign tasks accordingly."""
+The transcript may contain multiple speakers. Try to identify speakers and assign tasks accordingly.
 
-    def get_user_prompt_template(self) -> str:
-        """Returns the user prompt template for meeting mode."""
-        return """Meeting Date/Time: {date_str}
-
-Transcript:
-{transcript}
-
-Please provide a concise summary in Markdown format with the following sections:
+For each transcript, provide a concise summary in Markdown format with the following sections:
 
 ## Дата и время встречи
-{date_str}
+(the Meeting Date/Time given in the message)
 
 ## Ключевые темы
 - (List of main topics discussed)
@@ -39,3 +26,20 @@ Please provide a concise summary in Markdown format with the following sections:
 
 If any section is not applicable, state "Не указано" or "Нет".
 Try to assign tasks to specific speakers based on the conversation context."""
+
+_MEETING_USER_TEMPLATE = """Transcript:
+{transcript}
+
+Meeting Date/Time: {date_str}"""
+
+
+class MeetingPrompt(BasePrompt, mode="meeting"):
+    """Prompt template for standard meeting summarization."""
+
+    def get_system_prompt(self) -> str:
+        """Returns the system prompt for meeting mode."""
+        return _MEETING_SYSTEM
+
+    def get_user_prompt_template(self) -> str:
+        """Returns the user prompt template for meeting mode."""
+        return _MEETING_USER_TEMPLATE
@@ -0,0 +1,44 @@
+"""Local token counting, used to size requests before they are sent."""
+import functools
+from typing import Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Rough chars-per-token ratio when tiktoken is not installed (conservative for Cyrillic)
+CHARS_PER_TOKEN = 3
+
+
+@functools.lru_cache(maxsize=8)
+def _encoding(model_name: Optional[str]):
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except (KeyError, TypeError):
+        # DeepSeek models are unknown to tiktoken; cl100k is close enough for sizing
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def _estimated(model_name: Optional[str]) -> bool:
+    return tiktoken is None or (model_name or "").startswith("gemini")
+
+
+def count_tokens(text: str, model_name: Optional[str] = None) -> int:
+    """
+    Token count of text for sizing windows.
+
+    Uses tiktoken for OpenAI-style models; Gemini uses its own tokenizer (only
+    available via an API call), so it, and setups without tiktoken, get a length-based estimate.
+    """
+    if _estimated(model_name):
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(_encoding(model_name).encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model_name: Optional[str] = None) -> str:
+    """Keeps the last ~max_tokens tokens of text (the end of a meeting is where decisions are summed up)."""
+    if _estimated(model_name):
+        return text[-max_tokens * CHARS_PER_TOKEN:]
+    tokens = _encoding(model_name).encode(text, disallowed_special=())
+    return _encoding(model_name).decode(tokens[-max_tokens:])
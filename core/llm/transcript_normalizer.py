@@ -0,0 +1,46 @@
+"""Cheap local clean-up of ASR transcripts before they are sent to an LLM."""
+import re
+
+# Filler words ("э-э", "мм", "хм", "uh", "um") with the comma and spaces after them;
+# a single "м" is left alone, it's also the abbreviation for meters
+_FILLER_RE = re.compile(r"\b(?:uh-huh|э+|мм+|хм+|uh+|um+)\b(?:-(?:э+|мм+))*,?[ \t]*", re.IGNORECASE)
+# Whitespace runs inside a line (leading indentation is kept for Markdown lists)
+_SPACES_RE = re.compile(r"(?<=\S)[ \t]+")
+# Space left before punctuation by a removed filler
+_SPACE_BEFORE_PUNCT_RE = re.compile(r" +(?=[.,!?])")
+# Comma left in front of a sentence end by a removed filler ("важно, ммм." -> "важно,.")
+_DANGLING_COMMA_RE = re.compile(r",+(?=[.!?…])")
+# "[MM:SS] " prefix of diarized lines, ignored when comparing adjacent turns
+_TIMESTAMP_RE = re.compile(r"^\[\d+:\d{2}\]\s*")
+# A turn that is nothing but a speaker label once fillers are removed
+_EMPTY_TURN_RE = re.compile(r"^(?:\[\d+:\d{2}\]\s*)?Speaker \d+:\s*$")
+
+
+def normalize(transcript: str) -> str:
+    """
+    Shrinks a transcript without losing content, so fewer input tokens are sent.
+
+    Strips filler words, collapses whitespace inside lines, drops turns left empty
+    and collapses runs of identical adjacent turns (ASR retries/echo), comparing
+    them without their [MM:SS] timestamps. Blank lines between turns are kept.
+    """
+    lines = []
+    previous = None
+    for line in transcript.split("\n"):
+        line = _SPACES_RE.sub(" ", _FILLER_RE.sub("", line))
+        line = _SPACE_BEFORE_PUNCT_RE.sub("", line)
+        line = _DANGLING_COMMA_RE.sub("", line).rstrip()
+        if not line:
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        if _EMPTY_TURN_RE.match(line):
+            continue
+
+        content = _TIMESTAMP_RE.sub("", line)
+        if content == previous:
+            continue
+        previous = content
+        lines.append(line)
+
+    return "\n".join(lines).strip("\n")
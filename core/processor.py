@@ -1,23 +1,54 @@
+import asyncio
+import functools
+import hashlib
 import os
 import json
+import re
 import time
-from deepgram import DeepgramClient
+from typing import AsyncIterator, Iterator, Optional
+
+# Fix GRPC DNS resolution issues on macOS. Set before the SDK is imported,
+# since gRPC reads it once; an explicit setting in the environment wins
+os.environ.setdefault('GRPC_DNS_RESOLVER', 'native')
+
+from deepgram import AsyncDeepgramClient, DeepgramClient
+
+from core.http_client import get_async_http_client, get_http_client
+
+# Transient failures worth retrying
+_RETRYABLE_RE = re.compile(r"connection|timeout|network|dns|temporary", re.IGNORECASE)
+_DNS_ERROR_RE = re.compile(r"dns|grpc", re.IGNORECASE)
+
+# Audio is uploaded in chunks of this size instead of being read into memory whole
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Files up to this size are sent as a single body with a Content-Length (no chunked encoding)
+IN_MEMORY_UPLOAD_LIMIT = 8 * 1024 * 1024
+
+@functools.lru_cache(maxsize=8)
+def _deepgram_clients(api_key: str, timeout: int):
+    """
+    Sync and async Deepgram clients, built once per (key, timeout) and shared by
+    all DeepgramProcessor instances (both sit on the shared httpx pools).
+    """
+    # Use keyword argument to avoid BaseClient initialization errors
+    client = DeepgramClient(api_key=api_key, timeout=timeout, httpx_client=get_http_client())
+    aclient = AsyncDeepgramClient(api_key=api_key, timeout=timeout, httpx_client=get_async_http_client())
+    return client, aclient
+
 
 class DeepgramProcessor:
     """Sends audio to Deepgram with retry logic and parses speaker roles."""
     
-    def __init__(self, api_key: str, timeout: int = 600, max_retries: int = 3):
+    def __init__(self, api_key: str, timeout: int = 600, max_retries: int = 3, cache_dir: Optional[str] = None):
         if not api_key:
             raise ValueError("Deepgram API Key is missing.")
         self.api_key = api_key
         self.timeout = timeout
         self.max_retries = max_retries
+        # Transcripts of already processed audio, keyed by content hash (None = no cache)
+        self.cache_dir = cache_dir
         
-        # Fix GRPC DNS resolution issues on macOS
-        os.environ['GRPC_DNS_RESOLVER'] = 'native'
-        
-        # Use keyword argument to avoid BaseClient initialization errors
-        self.client = DeepgramClient(api_key=api_key, timeout=timeout)
+        self.client, self.aclient = _deepgram_clients(api_key, timeout)
 
     def process_audio(self, audio_path: str, model: str = "nova-2", language: str = "ru") -> str:
         """
@@ -27,17 +58,23 @@ class DeepgramProcessor:
         if not os.path.exists(audio_path):
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
+        cache_path = self._cache_path(audio_path, model, language)
+        cached = self._load_cached(cache_path)
+        if cached is not None:
+            return cached
+
         print(f"Sending {audio_path} to Deepgram...")
+
+        # Small files are read once and go out in one piece on every attempt
+        buffer_data = self._read_file(audio_path) if self._fits_in_memory(audio_path) else None
         
         # Retry with exponential backoff
         for attempt in range(self.max_retries):
             try:
-                with open(audio_path, "rb") as file:
-                    buffer_data = file.read()
-
                 # Correct call for deepgram-sdk v5+
+                # Large files are streamed, with a fresh iterator per attempt so retries re-send from the start
                 response = self.client.listen.v1.media.transcribe_file(
-                    request=buffer_data,
+                    request=buffer_data if buffer_data is not None else self._iter_file(audio_path),
                     model=model,
                     diarize=True,
                     smart_format=True,
@@ -45,33 +82,131 @@ class DeepgramProcessor:
                 )
                 
                 # Parse response
-                return self._parse_transcript(response)
+                transcript = self._parse_transcript(response)
+                self._store_cached(cache_path, transcript)
+                return transcript
 
             except Exception as e:
-                error_msg = str(e)
-                
-                # Check if it's a retryable error
-                is_retryable = any(keyword in error_msg.lower() for keyword in [
-                    'connection', 'timeout', 'network', 'dns', 'temporary'
-                ])
-                
-                if attempt < self.max_retries - 1 and is_retryable:
-                    wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
-                    print(f"[!] Attempt {attempt + 1} failed: {error_msg}")
-                    print(f"    Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                else:
-                    print(f"[-] Deepgram API Error after {attempt + 1} attempts: {e}")
-                    if 'dns' in error_msg.lower() or 'grpc' in error_msg.lower():
-                        print("\n[i] Troubleshooting tip: GRPC DNS resolution issue detected.")
-                        print("    GRPC_DNS_RESOLVER=native has been set, but the error persists.")
-                        print("    Try restarting your terminal or checking your network connection.")
-                    raise
+                time.sleep(self._retry_delay(e, attempt))
+
+    async def aprocess_audio(self, audio_path: str, model: str = "nova-2", language: str = "ru") -> str:
+        """
+        Async version of process_audio() for use inside an event loop (e.g. FastAPI endpoints).
+        """
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+        cache_path = await asyncio.to_thread(self._cache_path, audio_path, model, language)
+        cached = await asyncio.to_thread(self._load_cached, cache_path)
+        if cached is not None:
+            return cached
+
+        print(f"Sending {audio_path} to Deepgram...")
+
+        buffer_data = None
+        if self._fits_in_memory(audio_path):
+            buffer_data = await asyncio.to_thread(self._read_file, audio_path)
+
+        for attempt in range(self.max_retries):
+            try:
+                response = await self.aclient.listen.v1.media.transcribe_file(
+                    request=buffer_data if buffer_data is not None else self._aiter_file(audio_path),
+                    model=model,
+                    diarize=True,
+                    smart_format=True,
+                    language=language,
+                )
+
+                transcript = self._parse_transcript(response)
+                await asyncio.to_thread(self._store_cached, cache_path, transcript)
+                return transcript
+
+            except Exception as e:
+                await asyncio.sleep(self._retry_delay(e, attempt))
+
+    def _cache_path(self, audio_path: str, model: str, language: str) -> Optional[str]:
+        """Transcript cache file for this audio content and these options (blake2b of the file)."""
+        if not self.cache_dir:
+            return None
+        digest = hashlib.blake2b(f"{model}:{language}:".encode("utf-8"), digest_size=16)
+        for chunk in self._iter_file(audio_path):
+            digest.update(chunk)
+        return os.path.join(self.cache_dir, f"dg_{digest.hexdigest()}.json")
+
+    @staticmethod
+    def _load_cached(cache_path: Optional[str]) -> Optional[str]:
+        if cache_path is None:
+            return None
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                transcript = json.load(f)["transcript"]
+        except (OSError, ValueError, KeyError):
+            return None
+        print("[+] Transcript served from cache (same audio already processed)")
+        return transcript
+
+    @staticmethod
+    def _store_cached(cache_path: Optional[str], transcript: str) -> None:
+        # Placeholder results of failed parses are not worth keeping
+        if cache_path is None or transcript in ("No transcript generated.", "Error parsing transcript."):
+            return
+        tmp_path = cache_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"transcript": transcript}, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"[!] Warning: Failed to write transcript cache entry: {e}")
+
+    @staticmethod
+    def _fits_in_memory(path: str) -> bool:
+        return os.stat(path).st_size <= IN_MEMORY_UPLOAD_LIMIT
+
+    @staticmethod
+    def _read_file(path: str) -> bytes:
+        with open(path, "rb") as file:
+            return file.read()
+
+    @staticmethod
+    def _iter_file(path: str) -> Iterator[bytes]:
+        """Yields the file in UPLOAD_CHUNK_SIZE pieces, so the upload never holds more than one in memory."""
+        with open(path, "rb") as file:
+            while chunk := file.read(UPLOAD_CHUNK_SIZE):
+                yield chunk
+
+    @staticmethod
+    async def _aiter_file(path: str) -> AsyncIterator[bytes]:
+        """Async _iter_file() for the async client; each read runs in a worker thread."""
+        file = await asyncio.to_thread(open, path, "rb")
+        try:
+            while chunk := await asyncio.to_thread(file.read, UPLOAD_CHUNK_SIZE):
+                yield chunk
+        finally:
+            file.close()
+
+    def _retry_delay(self, e: Exception, attempt: int) -> float:
+        """Returns seconds to wait before the next attempt, or re-raises if retries are exhausted."""
+        error_msg = str(e)
+        
+        # Check if it's a retryable error
+        is_retryable = bool(_RETRYABLE_RE.search(error_msg))
+        
+        if attempt < self.max_retries - 1 and is_retryable:
+            wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
+            print(f"[!] Attempt {attempt + 1} failed: {error_msg}")
+            print(f"    Retrying in {wait_time} seconds...")
+            return wait_time
+        else:
+            print(f"[-] Deepgram API Error after {attempt + 1} attempts: {e}")
+            if _DNS_ERROR_RE.search(error_msg):
+                print("\n[i] Troubleshooting tip: GRPC DNS resolution issue detected.")
+                print("    GRPC_DNS_RESOLVER=native has been set, but the error persists.")
+                print("    Try restarting your terminal or checking your network connection.")
+            raise e
 
     def _parse_transcript(self, response) -> str:
         """Parses Deepgram JSON response into a readable transcript with [MM:SS] Speaker N: format."""
-        transcript_lines = []
-        
         try:
             # Navigate through the response object
             if not response.results or not response.results.channels:
@@ -80,23 +215,20 @@ class DeepgramProcessor:
             channel = response.results.channels[0]
             alternative = channel.alternatives[0]
             
-            if hasattr(alternative, 'paragraphs') and alternative.paragraphs:
-                paragraphs = alternative.paragraphs.paragraphs
-                for para in paragraphs:
-                    speaker = para.speaker
-                    start_time = para.start
-                    # Format time as [MM:SS]
-                    minutes = int(start_time // 60)
-                    seconds = int(start_time % 60)
-                    time_str = f"[{minutes:02}:{seconds:02}]"
-                    
-                    text = " ".join([s.text for s in para.sentences])
-                    transcript_lines.append(f"{time_str} Speaker {speaker}: {text}")
-            else:
+            paragraphs = getattr(alternative, 'paragraphs', None)
+            if not paragraphs:
                 # Fallback to words if paragraphs are missing (shouldn't happen with smart_format)
-                transcript_lines.append(alternative.transcript)
+                return alternative.transcript
 
-            return "\n\n".join(transcript_lines)
+            # [MM:SS] Speaker N: text, one paragraph per block
+            return "\n\n".join([
+                "[%02d:%02d] Speaker %s: %s" % (
+                    *divmod(int(para.start), 60),
+                    para.speaker,
+                    " ".join([sentence.text for sentence in para.sentences])
+                )
+                for para in paragraphs.paragraphs
+            ])
 
         except Exception as e:
             print(f"Error parsing transcript: {e}")
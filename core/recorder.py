@@ -11,10 +11,12 @@ class AudioRecorder:
     def __init__(self, device_name="Unit", samplerate=48000, channels=None):
         self.device_name = device_name
         self.samplerate = samplerate
-        self.device_index = self._find_device_index()
+        # Один опрос PortAudio — и для поиска устройства, и для проверки каналов, и для предупреждения
+        devices = sd.query_devices()
+        self.device_index = self._find_device_index(devices)
         
         # Получаем информацию об устройстве для проверки каналов
-        device_info = sd.query_devices(self.device_index)
+        device_info = devices[self.device_index]
         max_channels = device_info.get('max_input_channels', 0)
         
         if channels is None:
@@ -27,15 +29,14 @@ class AudioRecorder:
 
         print(f"[*] Initialized AudioRecorder: Device='{self.device_name}' (index {self.device_index}), Samplerate={self.samplerate}, Channels={self.channels}")
 
-    def _find_device_index(self):
+    def _find_device_index(self, devices):
         """Находит индекс аудиоустройства по имени."""
-        devices = sd.query_devices()
-        for i, device in enumerate(devices):
-            if self.device_name in device['name']:
-                return i
+        index = next((i for i, device in enumerate(devices) if self.device_name in device['name']), None)
+        if index is not None:
+            return index
         
         print(f"[!] Warning: Device '{self.device_name}' not found. Available devices:")
-        print(sd.query_devices())
+        print(devices)
         raise ValueError(f"Device '{self.device_name}' not found.")
 
     def record(self, output_dir="output", filename=None):
@@ -65,16 +66,19 @@ class AudioRecorder:
                                channels=self.channels, subtype='PCM_16') as file:
                 with sd.InputStream(samplerate=self.samplerate, device=self.device_index,
                                     channels=self.channels, callback=callback):
+                    # Локальные ссылки вместо поиска атрибутов/глобальных имён на каждом блоке
+                    q_get, write, q_empty = q.get, file.write, queue.Empty
                     while True:
                         try:
-                            data = q.get(timeout=0.2)
-                            if not data_started:
-                                if np.abs(data).max() > 0:
-                                    print("[+] Audio stream started (receiving signal!)...")
-                                    data_started = True
-                            file.write(data)
-                        except queue.Empty:
+                            data = q_get(timeout=0.2)
+                        except q_empty:
                             continue
+                        if not data_started:
+                            # any() stops at the first non-zero sample, no abs() copy of the block
+                            if data.any():
+                                print("[+] Audio stream started (receiving signal!)...")
+                                data_started = True
+                        write(data)
                         
         except KeyboardInterrupt:
             print("\n[!] Recording stopped by user.")
@@ -1,12 +1,20 @@
 """Recorder modules for audio capture."""
 from .base_recorder import BaseRecorder
-from .legacy_recorder import LegacyRecorder
 
-__all__ = ['BaseRecorder', 'LegacyRecorder']
+__all__ = ['BaseRecorder', 'LegacyRecorder', 'NativeRecorder']
 
-# Native recorder only available on macOS
-try:
-    from .native_recorder import NativeRecorder
-    __all__.append('NativeRecorder')
-except ImportError:
-    NativeRecorder = None
+
+def __getattr__(name):
+    # Backends are imported on first access, so importing base_recorder alone
+    # doesn't pull in sounddevice or PyObjC
+    if name == 'LegacyRecorder':
+        from .legacy_recorder import LegacyRecorder
+        return LegacyRecorder
+    if name == 'NativeRecorder':
+        # Native recorder only available on macOS
+        try:
+            from .native_recorder import NativeRecorder
+        except ImportError:
+            NativeRecorder = None
+        return NativeRecorder
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
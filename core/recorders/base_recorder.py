@@ -1,9 +1,13 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any
 
 class BaseRecorder(ABC):
     """Abstract base class for audio recorders."""
 
+    # No per-instance __dict__ forced on subclasses that declare their own __slots__
+    __slots__ = ()
+
     @property
     @abstractmethod
     def is_recording(self) -> bool:
@@ -23,6 +27,13 @@ class BaseRecorder(ABC):
             Path to the saved audio file
         """
         pass
+
+    async def arecord(self, output_dir: str = "output", filename: Optional[str] = None) -> str:
+        """
+        Async version of record(): records in a worker thread, so the event loop stays
+        free until stop() is called. Returns the path to the saved audio file.
+        """
+        return await asyncio.to_thread(self.record, output_dir=output_dir, filename=filename)
     
     @abstractmethod
     def stop(self) -> None:
@@ -31,6 +42,20 @@ class BaseRecorder(ABC):
         This should be called before exiting to ensure proper file cleanup.
         """
         pass
+
+    def wait_until_finalized(self, timeout: Optional[float] = None) -> None:
+        """
+        Block until the file returned by record() is complete on disk; call it before
+        reading the file. Recorders that finish writing inside record() needn't override it.
+        """
+        return None
+
+    def close(self) -> None:
+        """
+        Release resources kept between recordings (e.g. a capture stream kept alive).
+        Call it once the recorder is no longer needed; a no-op by default.
+        """
+        return None
     
     @abstractmethod
     def get_info(self) -> Dict[str, Any]:
@@ -2,23 +2,89 @@ import sounddevice as sd
 import soundfile as sf
 import numpy as np
 import os
-import queue
 import sys
 import threading
 from datetime import datetime
 from typing import Optional, Dict, Any
 from .base_recorder import BaseRecorder
 
+# Frames per audio callback block, and blocks held by the ring buffer (~5 s at 48 kHz)
+BLOCKSIZE = 1024
+RING_BLOCKS = 256
+# Blocks collected before a SoundFile.write (16384 frames per libsndfile call)
+WRITE_BLOCKS = 16
+
+
+class _BlockRing:
+    """
+    Preallocated single-producer/single-consumer ring of audio blocks.
+
+    The audio callback copies each block into a free slot, so it allocates
+    nothing and takes no locks. Only the producer advances `written` and only
+    the consumer advances `read`.
+    """
+
+    def __init__(self, blocks: int, blocksize: int, channels: int):
+        self.buffer = np.empty((blocks, blocksize, channels), dtype=np.float32)
+        self.frames = np.zeros(blocks, dtype=np.int64)
+        self.written = 0
+        self.read = 0
+        self.dropped = 0
+        self.ready = threading.Event()
+
+    def put(self, indata: np.ndarray, frames: int) -> None:
+        """Called from the audio callback."""
+        if self.written - self.read >= len(self.buffer):
+            # Writer fell more than a whole ring behind
+            self.dropped += 1
+            return
+        slot = self.written % len(self.buffer)
+        self.buffer[slot, :frames] = indata
+        self.frames[slot] = frames
+        self.written += 1
+        self.ready.set()
+
+    @property
+    def pending(self) -> int:
+        return self.written - self.read
+
+    def drain(self, max_blocks: int = WRITE_BLOCKS):
+        """
+        Yields the pending audio as views of up to max_blocks consecutive slots, so
+        they can be written in one call; slots are released once the next view is requested.
+        """
+        size = len(self.buffer)
+        blocksize = self.buffer.shape[1]
+        while self.read < self.written:
+            start = self.read % size
+            # A run can't wrap around the end of the ring or continue past a short block
+            end = start + 1
+            limit = start + min(max_blocks, self.written - self.read, size - start)
+            while end < limit and self.frames[end - 1] == blocksize:
+                end += 1
+            if end - start == 1:
+                yield self.buffer[start, :self.frames[start]]
+            else:
+                run = self.buffer[start:end]
+                frames = (end - start - 1) * blocksize + self.frames[end - 1]
+                yield run.reshape(-1, run.shape[2])[:frames]
+            self.read += end - start
+
+
 class LegacyRecorder(BaseRecorder):
     """Audio recorder using sounddevice (requires Aggregate Device like BlackHole + Mic)."""
+
+    __slots__ = ('device_name', 'samplerate', 'channels', 'device_index', '_recording', '_stop_event')
     
     def __init__(self, device_name: str = "Unit", samplerate: int = 48000, channels: Optional[int] = None):
         self.device_name = device_name
         self.samplerate = samplerate
-        self.device_index = self._find_device_index()
+        # One PortAudio enumeration serves the lookup, the channel check and the warning
+        devices = sd.query_devices()
+        self.device_index = self._find_device_index(devices)
         
         # Get device info to check channels
-        device_info = sd.query_devices(self.device_index)
+        device_info = devices[self.device_index]
         max_channels = device_info.get('max_input_channels', 0)
         
         if channels is None:
@@ -39,15 +105,14 @@ class LegacyRecorder(BaseRecorder):
         """Return True if recording is in progress."""
         return self._recording
     
-    def _find_device_index(self) -> int:
+    def _find_device_index(self, devices) -> int:
         """Find audio device index by name."""
-        devices = sd.query_devices()
-        for i, device in enumerate(devices):
-            if self.device_name in device['name']:
-                return i
+        index = next((i for i, device in enumerate(devices) if self.device_name in device['name']), None)
+        if index is not None:
+            return index
         
         print(f"[!] Warning: Device '{self.device_name}' not found. Available devices:")
-        print(sd.query_devices())
+        print(devices)
         raise ValueError(f"Device '{self.device_name}' not found.")
     
     def record(self, output_dir: str = "output", filename: Optional[str] = None) -> str:
@@ -59,12 +124,12 @@ class LegacyRecorder(BaseRecorder):
         filepath = os.path.join(output_dir, filename)
         os.makedirs(output_dir, exist_ok=True)
         
-        q = queue.Queue()
+        ring = _BlockRing(RING_BLOCKS, BLOCKSIZE, self.channels)
         
         def callback(indata, frames, time, status):
             if status:
                 print(f"\nStream status: {status}", file=sys.stderr)
-            q.put(indata.copy())
+            ring.put(indata, frames)
         
         print(f"\n[*] Recording to {filepath}")
         print(f"    Using device: {self.device_name} (index {self.device_index})")
@@ -78,17 +143,29 @@ class LegacyRecorder(BaseRecorder):
             with sf.SoundFile(filepath, mode='w', samplerate=self.samplerate,
                              channels=self.channels, subtype='PCM_16') as file:
                 with sd.InputStream(samplerate=self.samplerate, device=self.device_index,
-                                   channels=self.channels, callback=callback):
-                    while not self._stop_event.is_set():
-                        try:
-                            data = q.get(timeout=0.2)
+                                   channels=self.channels, blocksize=BLOCKSIZE,
+                                   dtype='float32', callback=callback):
+                    # Bound methods as locals: the loop runs for every write, without attribute lookups
+                    stop_is_set = self._stop_event.is_set
+                    ready_wait, ready_clear = ring.ready.wait, ring.ready.clear
+                    drain, write = ring.drain, file.write
+                    while not stop_is_set():
+                        if not ready_wait(0.2):
+                            continue
+                        # Cleared before draining, so a block written meanwhile sets it again
+                        ready_clear()
+                        if data_started and ring.pending < WRITE_BLOCKS:
+                            continue
+                        for data in drain():
                             if not data_started:
-                                if np.abs(data).max() > 0:
+                                # any() stops at the first non-zero sample, no abs() copy of the block
+                                if data.any():
                                     print("[+] Audio stream started (receiving signal!)...")
                                     data_started = True
-                            file.write(data)
-                        except queue.Empty:
-                            continue
+                            write(data)
+                # Remainder, including blocks that arrived after the last wait
+                for data in ring.drain():
+                    file.write(data)
         
         except KeyboardInterrupt:
             print("\n[!] Recording stopped by user.")
@@ -98,6 +175,8 @@ class LegacyRecorder(BaseRecorder):
         finally:
             self._recording = False
         
+        if ring.dropped:
+            print(f"[!] Warning: {ring.dropped} audio blocks were dropped (disk writes fell behind)")
         if not data_started:
             print("\n[!] WARNING: No audio data was received during the session!")
         
@@ -1,7 +1,7 @@
+import asyncio
 import os
 import threading
-import time
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from core.recorders.base_recorder import BaseRecorder
 from core.utils.audio_utils import merge_audio_files
 
@@ -18,16 +18,18 @@ class MultiRecorder(BaseRecorder):
         self.output_dir = "output"
         self.final_filename = "recording.wav"
         self.threads = []
+        self._stop_event = threading.Event()
+        # Set while arecord() is waiting; stop() may be called from another thread or a signal handler
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_stop_event: Optional[asyncio.Event] = None
         
-    def record(self, output_dir: str = "output", filename: Optional[str] = None) -> str:
-        """
-        Record from all streams in parallel.
-        This method will block until stop() is called.
-        """
+    def _start(self, output_dir: str, filename: Optional[str]) -> List[Tuple[BaseRecorder, str]]:
+        """Resets state for a new session; returns (recorder, part filename) pairs."""
         if not self.recorders:
             raise ValueError("MultiRecorder initialized with no sub-recorders")
             
         self._is_recording = True
+        self._stop_event.clear()
         self.output_paths = []
         self.output_dir = output_dir
         self.final_filename = filename if filename else "recording.wav"
@@ -35,31 +37,78 @@ class MultiRecorder(BaseRecorder):
         
         # Base filename without extension
         base_name = self.final_filename.rsplit('.', 1)[0]
+        return [(recorder, f"{base_name}_part_{idx}.wav") for idx, recorder in enumerate(self.recorders)]
+
+    def record(self, output_dir: str = "output", filename: Optional[str] = None) -> str:
+        """
+        Record from all streams in parallel.
+        This method will block until stop() is called.
+        """
+        streams = self._start(output_dir, filename)
         
-        def record_stream(recorder, idx):
-            stream_filename = f"{base_name}_part_{idx}.wav"
+        def record_stream(recorder, stream_filename):
             # This call blocks for each recorder until stop() is called
             path = recorder.record(output_dir=output_dir, filename=stream_filename)
             self.output_paths.append(path)
 
         # Start all recorders in separate threads
-        for i, recorder in enumerate(self.recorders):
-            t = threading.Thread(target=record_stream, args=(recorder, i), daemon=True)
+        for recorder, stream_filename in streams:
+            t = threading.Thread(target=record_stream, args=(recorder, stream_filename), daemon=True)
             self.threads.append(t)
             t.start()
             
         print(f"[>] Concurrent recording started ({len(self.recorders)} streams)")
         
         # Wait until stop() is called. individual recorders will finish their own blocking record() calls.
-        while self._is_recording:
-            time.sleep(0.1)
+        self._stop_event.wait()
             
         # Wait for all recorder threads to finish writing their files
         for t in self.threads:
             t.join(timeout=10)
             
-        # Merge files
+        return self._merge(output_dir)
+
+    async def arecord(self, output_dir: str = "output", filename: Optional[str] = None) -> str:
+        """
+        Async record(): every stream records in a worker thread while the event loop
+        waits on a single asyncio.Event until stop() is called.
+        """
+        streams = self._start(output_dir, filename)
+        self._loop = asyncio.get_running_loop()
+        self._async_stop_event = asyncio.Event()
+        
+        tasks = [
+            asyncio.create_task(asyncio.to_thread(recorder.record, output_dir=output_dir, filename=stream_filename))
+            for recorder, stream_filename in streams
+        ]
+        print(f"[>] Concurrent recording started ({len(self.recorders)} streams)")
+        
+        try:
+            await self._async_stop_event.wait()
+            
+            # Wait for all recorders to finish writing their files
+            done, _ = await asyncio.wait(tasks, timeout=10)
+        finally:
+            self._loop = None
+        
+        # Part files in recorder order; failed or unfinished streams are skipped
+        self.output_paths = [
+            task.result() for task in tasks
+            if task in done and task.exception() is None and task.result()
+        ]
+        return await asyncio.to_thread(self._merge, output_dir)
+
+    def _merge(self, output_dir: str) -> str:
+        """Merges the recorded part files into the final file and removes the parts."""
         merged_path = os.path.join(output_dir, self.final_filename)
+        
+        # Sub-recorders finalize their files in parallel; the parts are only read from here on
+        for recorder in self.recorders:
+            try:
+                recorder.wait_until_finalized()
+            except Exception as e:
+                print(f"[!] Error finalizing recorder: {e}")
+        
         print(f"\n[*] Merging {len(self.output_paths)} streams into {merged_path}...")
         
         try:
@@ -98,8 +147,20 @@ class MultiRecorder(BaseRecorder):
             except Exception as e:
                 print(f"[!] Error stopping recorder: {e}")
         
-        # 2. Set our own internal flag to False so record() continues to merge
+        # 2. Set our own internal flag to False and wake record() so it continues to merge
         self._is_recording = False
+        self._stop_event.set()
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._async_stop_event.set)
+
+    def close(self) -> None:
+        """Close all sub-recorders."""
+        for recorder in self.recorders:
+            try:
+                recorder.close()
+            except Exception as e:
+                print(f"[!] Error closing recorder: {e}")
 
     @property
     def is_recording(self) -> bool:
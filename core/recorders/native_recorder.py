@@ -3,16 +3,19 @@ Native macOS Audio Recorder using ScreenCaptureKit and AVAssetWriter.
 This implementation captures system audio without BlackHole by using
 AVFoundation's AVAssetWriter to save CMSampleBuffers directly.
 """
+import functools
 import os
 import sys
 import threading
-import time
+import uuid
+from concurrent.futures import Future
 from datetime import datetime
 from typing import Optional, Dict, Any
+from .base_recorder import BaseRecorder
 
 try:
     import objc
-    from Foundation import NSObject, NSURL, NSRunLoop, NSDefaultRunLoopMode
+    from Foundation import NSObject, NSURL, NSDictionary
     from AVFoundation import (
         AVAssetWriter, AVAssetWriterInput, AVMediaTypeAudio,
         AVFormatIDKey, AVSampleRateKey, AVNumberOfChannelsKey,
@@ -25,12 +28,22 @@ try:
     )
     from CoreMedia import CMSampleBufferGetPresentationTimeStamp
     from CoreAudio import kAudioFormatLinearPCM
+    # pyobjc-framework-libdispatch: sample buffers are delivered on a private queue. record()
+    # runs in a worker thread (arecord) and the main thread runs the event loop, so nothing
+    # would drain the main queue
+    from dispatch import dispatch_queue_create, DISPATCH_QUEUE_SERIAL
     
     NATIVE_AVAILABLE = True
 except ImportError as e:
     print(f"Warning: Native recorder dependencies not available: {e}")
     NATIVE_AVAILABLE = False
 
+try:
+    # QoS attributes are missing from older pyobjc releases
+    from dispatch import dispatch_queue_attr_make_with_qos_class, QOS_CLASS_USER_INTERACTIVE
+except ImportError:
+    dispatch_queue_attr_make_with_qos_class = None
+
 
 if NATIVE_AVAILABLE:
     class SCStreamAudioWriterDelegate(NSObject):
@@ -39,44 +52,67 @@ if NATIVE_AVAILABLE:
         def initWithWriterInput_andRecorder_(self, writer_input, recorder):
             self = objc.super(SCStreamAudioWriterDelegate, self).init()
             if self is None: return None
-            self.writer_input = writer_input
             self.recorder = recorder
-            self.session_started = False
+            self.attach_writer(recorder.writer, writer_input)
             return self
+
+        @objc.python_method
+        def attach_writer(self, writer, writer_input):
+            """Points the delegate at a new writer (a kept-alive stream rotates them between recordings)."""
+            self.writer_input = writer_input
+            self.session_started = False
+            # Bound once: the callback runs for every buffer, and each lookup goes through the bridge
+            self._is_ready = writer_input.isReadyForMoreMediaData
+            self._append = writer_input.appendSampleBuffer_
+            self._start_session = writer.startSessionAtSourceTime_
         
         def stream_didOutputSampleBuffer_ofType_(self, stream, sampleBuffer, outputType):
-            """Called when audio data is available."""
-            if outputType == SCStreamOutputTypeAudio:
-                if not self.recorder.is_writing:
+            """Called when audio data is available (on the sample queue, not a Python thread)."""
+            if outputType != SCStreamOutputTypeAudio:
+                return
+            recorder = self.recorder
+            # Held while appending, so stop() can't finish the input in between
+            with recorder.write_lock:
+                if not recorder.is_writing:
                     return
 
                 if not self.session_started:
                     # Start session with the first sample buffer's timestamp
-                    timestamp = CMSampleBufferGetPresentationTimeStamp(sampleBuffer)
-                    self.recorder.writer.startSessionAtSourceTime_(timestamp)
+                    self._start_session(CMSampleBufferGetPresentationTimeStamp(sampleBuffer))
                     self.session_started = True
-                    print("[+] Audio session started")
 
-                if self.writer_input.isReadyForMoreMediaData():
-                    success = self.writer_input.appendSampleBuffer_(sampleBuffer)
-                    if not success:
-                        # Only print once to avoid spamming
-                        if not hasattr(self, '_append_failed'):
-                            print(f"[!] Failed to append audio buffer: {self.recorder.writer.error()}")
-                            self._append_failed = True
+                if not self._is_ready():
+                    recorder.dropped_buffers += 1
+                elif not self._append(sampleBuffer):
+                    # Reported once by stop(), not printed per buffer
+                    recorder.failed_appends += 1
+
 
+@functools.lru_cache(maxsize=4)
+def _audio_settings(samplerate: int, channels: int, bit_depth: int):
+    """Linear PCM output settings, bridged to an NSDictionary once per format."""
+    return NSDictionary.dictionaryWithDictionary_({
+        AVFormatIDKey: kAudioFormatLinearPCM,
+        AVSampleRateKey: float(samplerate),
+        AVNumberOfChannelsKey: channels,
+        AVLinearPCMBitDepthKey: bit_depth,
+        AVLinearPCMIsFloatKey: False,
+        AVLinearPCMIsBigEndianKey: False,
+        AVLinearPCMIsNonInterleaved: False
+    })
 
-class NativeRecorder:
+
+class NativeRecorder(BaseRecorder):
     """
     Native macOS audio recorder using ScreenCaptureKit and AVAssetWriter.
     Doesn't require BlackHole or any virtual audio devices.
     """
     
-    def __init__(self, samplerate: int = 48000, exclude_current_process: bool = True):
+    def __init__(self, samplerate: int = 48000, exclude_current_process: bool = True, keep_stream_alive: bool = False):
         if not NATIVE_AVAILABLE:
             raise RuntimeError(
                 "Native recorder not available. Please install required dependencies:\n"
-                "pip install pyobjc-framework-ScreenCaptureKit pyobjc-framework-AVFoundation"
+                "pip install pyobjc-framework-ScreenCaptureKit pyobjc-framework-AVFoundation pyobjc-framework-libdispatch"
             )
         
         # Check macOS version
@@ -90,13 +126,24 @@ class NativeRecorder:
         
         self.samplerate = samplerate
         self.exclude_current_process = exclude_current_process
+        # Keep capturing between recordings (only the writer is replaced); close() stops it
+        self.keep_stream_alive = keep_stream_alive
         self.is_writing = False
         self._stop_event = threading.Event()
+        # Shared with the sample callback, which runs on a dispatch queue
+        self.write_lock = threading.Lock()
+        self.dropped_buffers = 0
+        self.failed_appends = 0
+        # Resolved once the capture is stopped and the file is finalized (see stop() and wait_until_finalized())
+        self.finalized: Optional[Future] = None
         
         self.writer = None
         self.writer_input = None
         self.stream = None
         self.delegate = None
+        self.sample_queue = None
+        self.output_path = None
+        self.partial_path = None
         
         print(f"[*] Native macOS Recorder Initialized")
         print(f"    ├─ Method: ScreenCaptureKit + AVAssetWriter")
@@ -110,14 +157,11 @@ class NativeRecorder:
     
     def _setup_writer(self, filepath: str):
         """Setup AVAssetWriter for the output file."""
-        # AVAssetWriter cannot overwrite files, so we must delete if exists
-        if os.path.exists(filepath):
-            try:
-                os.remove(filepath)
-            except Exception as e:
-                print(f"[!] Warning: Could not remove existing file {filepath}: {e}")
-
-        url = NSURL.fileURLWithPath_(filepath)
+        # AVAssetWriter cannot overwrite files: it writes to a fresh partial file,
+        # which replaces filepath once finalized (an interrupted run leaves filepath intact)
+        self.output_path = filepath
+        self.partial_path = f"{filepath}.{uuid.uuid4().hex[:8]}.partial.wav"
+        url = NSURL.fileURLWithPath_(self.partial_path)
         
         # Create asset writer (WAV)
         self.writer, error = AVAssetWriter.alloc().initWithURL_fileType_error_(
@@ -127,19 +171,9 @@ class NativeRecorder:
         if error:
             raise RuntimeError(f"Failed to create AVAssetWriter: {error}")
             
-        # Define audio settings (Linear PCM 16-bit)
-        audio_settings = {
-            AVFormatIDKey: kAudioFormatLinearPCM,
-            AVSampleRateKey: float(self.samplerate),
-            AVNumberOfChannelsKey: 2,
-            AVLinearPCMBitDepthKey: 16,
-            AVLinearPCMIsFloatKey: False,
-            AVLinearPCMIsBigEndianKey: False,
-            AVLinearPCMIsNonInterleaved: False
-        }
-        
+        # A new input per writer (an input can't be moved to another writer), the settings are shared
         self.writer_input = AVAssetWriterInput.assetWriterInputWithMediaType_outputSettings_(
-            AVMediaTypeAudio, audio_settings
+            AVMediaTypeAudio, _audio_settings(self.samplerate, 2, 16)
         )
         self.writer_input.setExpectsMediaDataInRealTime_(True)
         
@@ -201,18 +235,29 @@ class NativeRecorder:
             content_filter, config, None
         )
         
-        # Add output
+        # Add output. Sample buffers go to a serial queue of their own, so the recording
+        # thread only has to wait for stop(). (A None queue would mean the main queue, which
+        # isn't drained while the main thread runs the event loop.)
+        attr = DISPATCH_QUEUE_SERIAL
+        if dispatch_queue_attr_make_with_qos_class is not None:
+            # Audio shouldn't wait behind lower-priority work
+            attr = dispatch_queue_attr_make_with_qos_class(attr, QOS_CLASS_USER_INTERACTIVE, 0)
+        self.sample_queue = dispatch_queue_create(b"meeting-assistant.native-audio", attr)
         error = None
-        # Passing None for queue often works in PyObjC as it defaults to the main queue
         success, error = self.stream.addStreamOutput_type_sampleHandlerQueue_error_(
-            self.delegate, SCStreamOutputTypeAudio, None, None
+            self.delegate, SCStreamOutputTypeAudio, self.sample_queue, None
         )
         
         if not success:
             raise RuntimeError(f"Failed to add stream output: {error}")
 
     def record(self, output_dir: str = "output", filename: Optional[str] = None) -> str:
-        """Record system audio until stopped."""
+        """
+        Record system audio until stopped. Returns as soon as the capture is stopped;
+        the file is finalized in the background, see wait_until_finalized().
+        """
+        # A previous recording may still be finishing its writer
+        self.wait_until_finalized()
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"recording_{timestamp}.wav"
@@ -228,32 +273,41 @@ class NativeRecorder:
         
         try:
             self._setup_writer(filepath)
-            self._setup_stream()
-            
-            # Start capture
-            self.is_writing = True
-            
-            # SCStream.startCaptureWithCompletionHandler_
-            finished = threading.Event()
-            def start_handler(error):
-                if error:
-                    print(f"[-] Failed to start capture: {error}")
-                finished.set()
+            self.dropped_buffers = self.failed_appends = 0
+            self.finalized = None
+
+            if self.stream is not None:
+                # Stream kept alive by the previous recording: samples go to the new writer
+                # from here on, without re-querying shareable content or restarting capture
+                with self.write_lock:
+                    self.delegate.attach_writer(self.writer, self.writer_input)
+                    self.is_writing = True
+                print("[*] Reusing the running capture stream")
+            else:
+                self._setup_stream()
+                
+                # Start capture
+                self.is_writing = True
                 
-            self.stream.startCaptureWithCompletionHandler_(start_handler)
-            finished.wait(timeout=5)
+                # SCStream.startCaptureWithCompletionHandler_
+                finished = threading.Event()
+                def start_handler(error):
+                    if error:
+                        print(f"[-] Failed to start capture: {error}")
+                    finished.set()
+                    
+                self.stream.startCaptureWithCompletionHandler_(start_handler)
+                finished.wait(timeout=5)
             
             print(f"\n[*] Output: {filepath}")
             print("[>] RECORDING... Press Ctrl+C to stop")
             
             self._stop_event.clear()
-            while not self._stop_event.is_set():
-                # Allow run loop to process callbacks if needed
-                NSRunLoop.currentRunLoop().runMode_beforeDate_(
-                    NSDefaultRunLoopMode, 
-                    datetime.now()
-                )
-                time.sleep(0.1)
+            # Callbacks run on the sample queue: nothing to do until stop(), apart
+            # from one check that audio arrives (the callback itself never prints)
+            if not self._stop_event.wait(1.0):
+                self._report_session_start()
+            self._stop_event.wait()
                 
         except KeyboardInterrupt:
             print("\n[!] Interrupted by user")
@@ -266,15 +320,42 @@ class NativeRecorder:
             
         return filepath
     
+    def _report_session_start(self) -> bool:
+        """Prints the 'receiving audio' notice once the delegate has started the writer session."""
+        if self.delegate is None or not self.delegate.session_started:
+            return False
+        print("[+] Audio stream started (receiving signal!)...")
+        return True
+
     def stop(self) -> None:
-        """Gracefully stop recording."""
+        """
+        Gracefully stop recording. Returns right away (it may run in a signal handler);
+        stopping the capture and finalizing the file (up to ~15 s) continue in a
+        background thread, tracked by self.finalized.
+        """
         if not self.is_writing:
             return
             
         print("\n[*] Stopping native recorder...")
-        self.is_writing = False
+        with self.write_lock:
+            self.is_writing = False
         self._stop_event.set()
         
+        self.finalized = Future()
+        # Not a daemon: the interpreter waits for the file to be finalized before exiting
+        threading.Thread(target=self._finalize, args=(self.finalized,), name="native-finalize").start()
+
+    def _finalize(self, future: Future) -> None:
+        try:
+            self._finish_writing()
+        except Exception as e:
+            print(f"[-] Failed to finalize native recording: {e}")
+            future.set_exception(e)
+        else:
+            future.set_result(None)
+
+    def _stop_stream(self) -> None:
+        """Stops the capture, waiting for its completion handler."""
         if self.stream:
             # SCStream.stopCaptureWithCompletionHandler_
             finished_stop = threading.Event()
@@ -283,6 +364,25 @@ class NativeRecorder:
                 
             self.stream.stopCaptureWithCompletionHandler_(stop_handler)
             finished_stop.wait(timeout=5)
+            self.stream = None
+
+    def wait_until_finalized(self, timeout: Optional[float] = None) -> None:
+        """Blocks until the last recording's file is complete (re-raises a finalization error)."""
+        if self.finalized is not None:
+            self.finalized.result(timeout)
+
+    def close(self) -> None:
+        """Stops a capture stream kept alive between recordings."""
+        # The writer has to finish before the stream feeding it goes away
+        try:
+            self.wait_until_finalized()
+        finally:
+            self._stop_stream()
+
+    def _finish_writing(self) -> None:
+        """Stops the capture (unless it is kept alive) and finishes the AVAssetWriter, waiting for the completion handlers."""
+        if not self.keep_stream_alive:
+            self._stop_stream()
             
         if self.writer:
             if self.writer_input:
@@ -297,10 +397,21 @@ class NativeRecorder:
             if not finished_writer.wait(timeout=10):
                  print("[!] Warning: finishWriting timed out")
             
+            if self.delegate is not None and not self.delegate.session_started:
+                print("[!] WARNING: No audio data was received during the session!")
+            if self.failed_appends:
+                print(f"[!] Failed to append {self.failed_appends} audio buffers: {self.writer.error()}")
+            if self.dropped_buffers:
+                print(f"[!] Warning: {self.dropped_buffers} audio buffers were dropped (writer not ready)")
             if self.writer.status() == 3: # Failed
                 print(f"[-] Writer failed: {self.writer.error()}")
             else:
-                print("[+] Audio file finalized")
+                try:
+                    os.replace(self.partial_path, self.output_path)
+                    print("[+] Audio file finalized")
+                except FileNotFoundError:
+                    # Nothing was written (no session was started)
+                    print(f"[!] Warning: No audio file was written to {self.output_path}")
         
         print("[+] Native recording complete")
 
@@ -1,7 +1,42 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import soundfile as sf
-from typing import List
+from typing import Iterator, List, Optional, Tuple
+
+try:
+    from numba import njit, prange
+except ImportError:  # Optional: without it the mix is computed with NumPy
+    njit = None
+
+# Frames mixed per step when merging streams (~22 s at 48 kHz)
+MERGE_BLOCK_FRAMES = 1024 * 1024
+INT16_MAX = 32767
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _mix_kernel(blocks, out, pcm16):
+        """
+        Channel average, sum and peak of one block in a single pass: blocks is a tuple
+        of (frames, channels) reads (shorter ones are padded with silence), out the mix.
+        """
+        peak = 0.0
+        for i in prange(out.shape[0]):
+            s = 0.0
+            for k in range(len(blocks)):
+                block = blocks[k]
+                if i < block.shape[0]:
+                    acc = 0.0
+                    for channel in range(block.shape[1]):
+                        acc += block[i, channel]
+                    # Integer streams average like the NumPy path's floor division
+                    s += np.floor(acc / block.shape[1]) if pcm16 else acc / block.shape[1]
+            out[i] = s
+            peak = max(peak, abs(s))
+        return peak
+else:
+    _mix_kernel = None
 
 def merge_audio_files(input_files: List[str], output_file: str) -> str:
     """
@@ -13,47 +48,111 @@ def merge_audio_files(input_files: List[str], output_file: str) -> str:
     
     if len(input_files) == 1:
         # Just copy if single file (though shouldn't happen in dual mode)
-        data, samplerate = sf.read(input_files[0])
-        sf.write(output_file, data, samplerate)
+        info = sf.info(input_files[0])
+        if info.format == 'WAV' and info.subtype == 'PCM_16' and output_file.lower().endswith('.wav'):
+            # Already what sf.write would produce: move it instead of decoding and re-encoding
+            os.replace(input_files[0], output_file)
+            return output_file
+        # Re-encoded block by block as float32, not read whole as float64
+        with sf.SoundFile(output_file, mode='w', samplerate=info.samplerate, channels=info.channels) as out:
+            for block in sf.blocks(input_files[0], blocksize=MERGE_BLOCK_FRAMES, dtype='float32'):
+                out.write(block)
         return output_file
 
-    audio_data = []
-    max_len = 0
-    target_samplerate = 0
-    
-    for f in input_files:
-        data, samplerate = sf.read(f)
-        # Ensure they have the same samplerate (we assume 48k as per config)
-        if target_samplerate == 0:
-            target_samplerate = samplerate
-        elif samplerate != target_samplerate:
-            # Simple check, we could resample but our recorders are configured for the same SR
-            print(f"[!] Warning: Samplerate mismatch: {samplerate} vs {target_samplerate}")
-
-        # Convert to mono if it's stereo for easier mixing if needed
-        # But actually, we prefer keeping stereo if both are stereo
-        if len(data.shape) > 1 and data.shape[1] > 1:
-            # Average channels to mono for mixing
-            data = np.mean(data, axis=1)
-            
-        audio_data.append(data)
-        max_len = max(max_len, len(data))
-
-    # Pad with zeros to the same length and mix
-    mixed_audio = np.zeros(max_len)
-    for data in audio_data:
-        # Pad at the end
-        padded = np.zeros(max_len)
-        padded[:len(data)] = data
-        mixed_audio += padded
-
-    # Normalize to avoid clipping
-    # Since we sum N streams, divide by N or normalize by max
-    if len(audio_data) > 0:
-        max_val = np.max(np.abs(mixed_audio))
-        if max_val > 1.0:
-            mixed_audio = mixed_audio / max_val
-
-    # Save as mono WAV (Deepgram loves mono)
-    sf.write(output_file, mixed_audio, target_samplerate)
+    files = [sf.SoundFile(f) for f in input_files]
+    try:
+        target_samplerate = files[0].samplerate
+        for f in files[1:]:
+            # Ensure they have the same samplerate (we assume 48k as per config)
+            if f.samplerate != target_samplerate:
+                # Simple check, we could resample but our recorders are configured for the same SR
+                print(f"[!] Warning: Samplerate mismatch: {f.samplerate} vs {target_samplerate}")
+
+        # Our recorders write PCM16, which is mixed as integers; anything else goes through float32
+        pcm16 = all(f.subtype == 'PCM_16' for f in files)
+        full_scale = INT16_MAX if pcm16 else 1.0
+
+        with ThreadPoolExecutor(max_workers=len(files)) as pool:
+            # Save as mono WAV (Deepgram loves mono). The mix is written as it is
+            # computed while its peak is tracked; only if it turns out to clip is it
+            # computed a second time, normalized, over the same file
+            max_val = _write_mix(output_file, files, pool, pcm16, target_samplerate, scale=None)
+            if max_val > full_scale:
+                _write_mix(output_file, files, pool, pcm16, target_samplerate, scale=full_scale / max_val)
+    finally:
+        for f in files:
+            f.close()
     return output_file
+
+
+def _write_mix(output_file: str, files: List[sf.SoundFile], pool: ThreadPoolExecutor,
+               pcm16: bool, samplerate: int, scale: Optional[float]) -> float:
+    """Writes the mix as mono PCM16 (scaled by scale, if given); returns its peak before scaling."""
+    max_val = 0
+    with sf.SoundFile(output_file, mode='w', samplerate=samplerate,
+                      channels=1, subtype='PCM_16') as out:
+        for mixed, peak in _mix_blocks(files, pool, pcm16):
+            max_val = max(max_val, peak)
+            if not pcm16:
+                if scale is not None:
+                    mixed *= scale
+                out.write(mixed)
+                continue
+            if scale is not None:
+                mixed = np.rint(mixed * scale)
+            # Saturating cast; int16 goes to libsndfile without a float conversion
+            out.write(np.clip(mixed, -INT16_MAX - 1, INT16_MAX).astype(np.int16))
+    return max_val
+
+
+def _to_mono(data: np.ndarray, pcm16: bool, out: np.ndarray) -> np.ndarray:
+    """
+    Averages the channels of a block read as int16 or float32 to mono for mixing,
+    into out (int32/float32, reused across blocks). Mono blocks are returned as a view.
+    """
+    channels = data.shape[1]
+    if channels == 1:
+        return data[:, 0]
+    # Channel by channel with elementwise adds: a reduction over a 2-long axis (mean/sum)
+    # doesn't vectorize, one add per channel over the whole block does.
+    # In int32 for PCM16, where the channel sum can't overflow
+    out = out[:len(data)]
+    np.add(data[:, 0], data[:, 1], out=out, dtype=out.dtype)
+    for channel in range(2, channels):
+        np.add(out, data[:, channel], out=out)
+    if not pcm16:
+        out *= np.float32(1 / channels)
+        return out
+    return np.floor_divide(out, channels, out=out)
+
+
+def _mix_blocks(files: List[sf.SoundFile], pool: ThreadPoolExecutor, pcm16: bool) -> Iterator[Tuple[np.ndarray, float]]:
+    """
+    Yields the equal-weight mono mix of all files and its peak, MERGE_BLOCK_FRAMES at a time.
+    Shorter files count as silence at the end; their blocks are read in parallel.
+    """
+    for f in files:
+        f.seek(0)
+    max_len = max(f.frames for f in files)
+    block_frames = min(MERGE_BLOCK_FRAMES, max_len)
+    # Read buffers and the accumulator are allocated once and reused for every block,
+    # so each yielded mix is only valid until the next one is requested
+    buffers = [np.empty((block_frames, f.channels), dtype=np.int16 if pcm16 else np.float32) for f in files]
+    # int32 accumulator: the sum of several full-scale int16 streams doesn't overflow
+    accumulator = np.empty(block_frames, dtype=np.int32 if pcm16 else np.float32)
+    mono = np.empty_like(accumulator)
+    for start in range(0, max_len, MERGE_BLOCK_FRAMES):
+        frames = min(MERGE_BLOCK_FRAMES, max_len - start)
+        mixed = accumulator[:frames]
+        blocks = list(pool.map(lambda item: item[0].read(out=item[1][:frames]), zip(files, buffers)))
+        if _mix_kernel is not None:
+            yield mixed, _mix_kernel(tuple(blocks), mixed, pcm16)
+            continue
+
+        mixed.fill(0)
+        for block in blocks:
+            # Added to the mix right away, so one channel-average buffer serves every file
+            block = _to_mono(block, pcm16, mono)
+            mixed[:len(block)] += block
+        # max/-min instead of abs(): no temporary the size of the block
+        yield mixed, max(mixed.max().item(), -mixed.min().item())
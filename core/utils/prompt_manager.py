@@ -1,24 +1,23 @@
 """Prompt manager factory for retrieving mode-specific prompts."""
-from core.llm.prompts.base_prompt import BasePrompt
-from core.llm.prompts.meeting_prompt import MeetingPrompt
-from core.llm.prompts.english_prompt import EnglishPrompt
-from core.llm.prompts.interview_prompt import InterviewPrompt
+import functools
+from typing import Tuple
+
+from core.llm.prompts.base_prompt import BasePrompt, MODE_REGISTRY
+# Imported for their registration in MODE_REGISTRY
+from core.llm.prompts import meeting_prompt, english_prompt, interview_prompt  # noqa: F401
 
 
 class PromptManager:
     """Factory class for retrieving mode-specific prompt instances."""
 
-    # Valid mode strings
-    VALID_MODES = {
-        "meeting": MeetingPrompt,
-        "english": EnglishPrompt,
-        "interview": InterviewPrompt,
-    }
+    # Valid mode strings (mode -> prompt class, as registered by the prompt modules)
+    VALID_MODES = MODE_REGISTRY
+    _VALID_MODES_TUPLE = tuple(MODE_REGISTRY)
 
     @classmethod
     def get_prompt(cls, mode: str = "meeting") -> BasePrompt:
         """
-        Get the appropriate prompt instance based on mode.
+        Get the appropriate prompt instance based on mode (cached per mode).
         
         Args:
             mode: Mode string ("meeting", "english", "interview")
@@ -29,18 +28,23 @@ class PromptManager:
         Raises:
             ValueError: If mode is not recognized
         """
-        mode_lower = mode.lower().strip()
-        
-        if mode_lower not in cls.VALID_MODES:
-            valid_modes = ", ".join(cls.VALID_MODES.keys())
+        try:
+            prompt_class = cls.VALID_MODES[mode.lower().strip()]
+        except KeyError:
+            valid_modes = ", ".join(cls._VALID_MODES_TUPLE)
             raise ValueError(
                 f"Invalid mode '{mode}'. Valid modes are: {valid_modes}"
-            )
+            ) from None
         
-        prompt_class = cls.VALID_MODES[mode_lower]
-        return prompt_class()
+        return _prompt_instance(prompt_class)
 
     @classmethod
-    def get_valid_modes(cls) -> list:
-        """Returns a list of valid mode strings."""
-        return list(cls.VALID_MODES.keys())
+    def get_valid_modes(cls) -> Tuple[str, ...]:
+        """Returns the valid mode strings (computed once at import)."""
+        return cls._VALID_MODES_TUPLE
+
+
+@functools.lru_cache(maxsize=8)
+def _prompt_instance(prompt_class: type) -> BasePrompt:
+    """One shared instance per prompt class: prompts are stateless (templates parsed once)."""
+    return prompt_class()
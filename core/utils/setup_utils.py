@@ -1,23 +1,68 @@
+import functools
+import threading
+from typing import List, Tuple
+
 import sounddevice as sd
 from core.config_manager import ConfigManager
 
+
+# (provider, model, description) offered by the setup wizard, and the menu rendered from them
+_LLM_OPTIONS = (
+    ("deepseek", "deepseek-chat", "DeepSeek V3 (Recommended, requires DEEPSEEK_API_KEY)"),
+    ("deepseek", "deepseek-reasoner", "DeepSeek R1 (Thinking Model)"),
+    ("chatgpt", "gpt-4o", "ChatGPT 4o (Requires OPENAI_API_KEY)"),
+    ("chatgpt", "gpt-4o-mini", "ChatGPT 4o-mini (Faster/Cheaper)"),
+    ("gemini", "gemini-2.0-flash", "Gemini 2.0 Flash (Fast)"),
+    ("gemini", "gemini-1.5-flash", "Gemini 1.5 Flash (Legacy)"),
+)
+_LLM_MENU = "\n".join(
+    f"    {i}. {model} ({provider}) - {desc}" for i, (provider, model, desc) in enumerate(_LLM_OPTIONS, start=1)
+)
+
+# Serializes the query, so a prefetch in progress is waited for instead of repeated
+_DEVICES_LOCK = threading.Lock()
+
+
+def _input_devices() -> Tuple[List[Tuple[int, str]], str]:
+    with _DEVICES_LOCK:
+        return _query_input_devices()
+
+
+def prefetch_input_devices() -> None:
+    """Starts the (slow when cold) PortAudio enumeration in the background."""
+    threading.Thread(target=_input_devices, name="device-prefetch", daemon=True).start()
+
+
+@functools.lru_cache(maxsize=1)
+def _query_input_devices() -> Tuple[List[Tuple[int, str]], str]:
+    """
+    Queries PortAudio once per process; returns the (index, name) pairs of input
+    devices and the rendered menu, both reused if setup is run again.
+    """
+    devices = sd.query_devices()
+    inputs = [(i, dev['name'], dev['max_input_channels']) for i, dev in enumerate(devices) if dev['max_input_channels'] > 0]
+    menu = "\n".join(
+        f"    {number}. {name} (index {i}, channels {channels})"
+        for number, (i, name, channels) in enumerate(inputs, start=1)
+    )
+    return [(i, name) for i, name, _ in inputs], menu
+
+
 def interactive_setup(config: ConfigManager):
     """
     Interactively setup the application configuration.
     """
+    # Device enumeration overlaps with printing the header
+    prefetch_input_devices()
     print("\n" + "-" * 60)
     print("[*] Meeting Assistant Setup")
     print("-" * 60)
     
     # 1. Select Audio Device
     print("\n[i] Available Audio Input Devices:")
-    devices = sd.query_devices()
-    input_devices = []
-    
-    for i, dev in enumerate(devices):
-        if dev['max_input_channels'] > 0:
-            input_devices.append((i, dev['name']))
-            print(f"    {len(input_devices)}. {dev['name']} (index {i}, channels {dev['max_input_channels']})")
+    input_devices, menu = _input_devices()
+    if menu:
+        print(menu)
     
     if not input_devices:
         print("[-] No input devices found!")
@@ -47,18 +92,10 @@ def interactive_setup(config: ConfigManager):
     print("    Select which AI model to use for summarization.")
     print("-" * 60)
     
-    llm_options = [
-        ("deepseek", "deepseek-chat", "DeepSeek V3 (Recommended, requires DEEPSEEK_API_KEY)"),
-        ("deepseek", "deepseek-reasoner", "DeepSeek R1 (Thinking Model)"),
-        ("chatgpt", "gpt-4o", "ChatGPT 4o (Requires OPENAI_API_KEY)"),
-        ("chatgpt", "gpt-4o-mini", "ChatGPT 4o-mini (Faster/Cheaper)"),
-        ("gemini", "gemini-2.0-flash", "Gemini 2.0 Flash (Fast)"),
-        ("gemini", "gemini-1.5-flash", "Gemini 1.5 Flash (Legacy)")
-    ]
+    llm_options = _LLM_OPTIONS
     
     print("\nAvailable Models:")
-    for i, (provider, model, desc) in enumerate(llm_options):
-        print(f"    {i+1}. {model} ({provider}) - {desc}")
+    print(_LLM_MENU)
         
     while True:
         try:
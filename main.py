@@ -1,16 +1,27 @@
 import os
 import sys
 import signal
+import traceback
 import argparse
 import asyncio
 from datetime import datetime
 from core.config_manager import ConfigManager
+from core.http_client import close_async_http_client
 from recorder_factory import RecorderFactory
-from core.processor import DeepgramProcessor
+from core.processor import DeepgramProcessor, IN_MEMORY_UPLOAD_LIMIT
 from core.llm import create_llm_provider
-from core.utils.setup_utils import interactive_setup, check_first_run
 from core.utils.prompt_manager import PromptManager
 
+# Parent of the per-session folders
+OUTPUT_DIR = "output"
+# Session folder name (with seconds, to avoid collisions if restarted quickly), file name suffix, transcript header
+SESSION_DIR_FORMAT = "%Y_%m_%d %H:%M:%S"
+FILE_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+HEADER_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Transcripts shorter than this (in words) aren't worth an LLM call, e.g. test recordings
+MIN_SUMMARY_WORDS = 50
+
 # Global recorder instance for signal handling
 recorder_instance = None
 start_datetime = None
@@ -24,6 +35,26 @@ def signal_handler(sig, frame):
         print("\n\n[!] Interrupt received. Exiting...")
         sys.exit(0)
 
+def write_transcript(transcript_path: str, transcript: str, meeting_datetime: datetime) -> None:
+    """Saves the transcript as Markdown with a date header."""
+    with open(transcript_path, "w") as f:
+        f.write(f"# Meeting Transcript\n\n")
+        f.write(f"**Date/Time:** {meeting_datetime.strftime(HEADER_DATETIME_FORMAT)}\n\n")
+        f.write(f"---\n\n")
+        f.write(transcript)
+
+async def save_transcript(transcript_path: str, transcript: str, meeting_datetime: datetime) -> None:
+    """write_transcript() in a worker thread, reporting the result as soon as the file is on disk."""
+    try:
+        await asyncio.to_thread(write_transcript, transcript_path, transcript, meeting_datetime)
+        print(f"[+] Transcript saved to: {transcript_path}")
+    except Exception as e:
+        print(f"[-] Failed to save transcript: {e}")
+
+def append_and_flush(f, text: str) -> None:
+    f.write(text)
+    f.flush()
+
 def select_mode_interactive() -> str:
     """
     Interactive mode selection menu.
@@ -77,11 +108,14 @@ async def main(existing_audio_path: str = None, force_setup: bool = False, mode:
         print(f"[-] Configuration Error: {e}")
         return
 
-    # 2. Check for first run or forced setup
-    if force_setup or (not existing_audio_path and check_first_run(config)):
-        if not interactive_setup(config):
-            print("[-] Setup failed. Exiting.")
-            return
+    # 2. Check for first run or forced setup (not needed to process an existing file, so -f
+    # runs don't import the device setup and with it sounddevice/PortAudio)
+    if force_setup or not existing_audio_path:
+        from core.utils.setup_utils import interactive_setup, check_first_run
+        if force_setup or check_first_run(config):
+            if not interactive_setup(config):
+                print("[-] Setup failed. Exiting.")
+                return
 
     # 2.5. Mode selection
     if mode is None:
@@ -107,12 +141,10 @@ async def main(existing_audio_path: str = None, force_setup: bool = False, mode:
     print("[*] Meeting Assistant initialized.")
     print("-" * 60)
     
-    # Set GRPC DNS resolver to prevent gRPC issues on macOS
-    os.environ['GRPC_DNS_RESOLVER'] = 'native'
-    
     # Show recording method
     print(f"[+] Configuration loaded")
-    print(f"    Recording method: {config.get_recording_method()}")
+    if not existing_audio_path:
+        print(f"    Recording method: {config.get_recording_method()}")
     
     # 2. Get API keys
     deepgram_key = config.get_deepgram_api_key()
@@ -136,24 +168,25 @@ async def main(existing_audio_path: str = None, force_setup: bool = False, mode:
     
     # 4. Initialize components
     try:
-        # Only init recorder if we need to record
-        if not existing_audio_path:
-            recorder_instance = RecorderFactory.create_recorder(config)
-            print(f"[+] Recorder initialized: {recorder_instance.get_info()['type']}")
-        else:
-            recorder_instance = None
-        
         trans_settings = config.get_transcription_settings()
-        processor = DeepgramProcessor(
-            api_key=deepgram_key,
-            timeout=trans_settings.get('timeout', 600),
-            max_retries=3
+        # The three are independent: load the recorder's native frameworks and set up the
+        # API clients in worker threads at the same time instead of one after another
+        recorder_instance, processor, summarizer = await asyncio.gather(
+            # Only init recorder if we need to record
+            asyncio.to_thread(RecorderFactory.create_recorder, config) if not existing_audio_path else asyncio.sleep(0),
+            asyncio.to_thread(
+                DeepgramProcessor,
+                api_key=deepgram_key,
+                timeout=trans_settings.get('timeout', 600),
+                max_retries=3,
+                cache_dir=config.get_transcription_cache_dir()
+            ),
+            # Re-runs on the same file (-f) are served from the on-disk response cache
+            asyncio.to_thread(create_llm_provider, config, persistent_cache=True),
         )
+        if recorder_instance is not None:
+            print(f"[+] Recorder initialized: {recorder_instance.get_info()['type']}")
         print("[+] Transcription processor initialized")
-        
-        print("[+] Transcription processor initialized")
-        
-        summarizer = create_llm_provider(config)
         print(f"[+] Summarizer initialized ({config.get_llm_model_name()})")
         
     except Exception as e:
@@ -161,15 +194,25 @@ async def main(existing_audio_path: str = None, force_setup: bool = False, mode:
         return
     
     # 5. Prepare Session Folder
-    start_datetime = datetime.now()
-    
+    # Output files are named after this run, so re-runs on the same file (e.g. in another mode)
+    # don't overwrite earlier transcripts and summaries
+    run_datetime = datetime.now()
     if existing_audio_path:
+        # The recording's own time, not the time of this run: it goes into the prompt, and
+        # with it the response cache key, so re-runs on the same file can hit the cache
+        start_datetime = datetime.fromtimestamp(os.path.getmtime(existing_audio_path))
         session_dir = os.path.dirname(os.path.abspath(existing_audio_path))
     else:
-        # Include seconds to avoid collisions if restarted quickly
-        session_name = start_datetime.strftime("%Y_%m_%d %H:%M:%S")
-        session_dir = os.path.join("output", session_name)
-        os.makedirs(session_dir, exist_ok=True)
+        start_datetime = run_datetime
+        session_name = start_datetime.strftime(SESSION_DIR_FORMAT)
+        session_dir = os.path.join(OUTPUT_DIR, session_name)
+        # output/ exists after the first run, so a single mkdir of the leaf is usually enough
+        try:
+            os.mkdir(session_dir)
+        except FileNotFoundError:
+            os.makedirs(session_dir, exist_ok=True)
+        except FileExistsError:
+            pass
     
     print(f"[*] Session directory: {session_dir}")
     print("-" * 60)
@@ -186,17 +229,26 @@ async def main(existing_audio_path: str = None, force_setup: bool = False, mode:
             
             # Use simple fixed filename since the folder timestamp is unique
             audio_filename = "recording.wav"
-            audio_path = recorder_instance.record(output_dir=session_dir, filename=audio_filename)
+            audio_path = await recorder_instance.arecord(output_dir=session_dir, filename=audio_filename)
+            # Native recordings are finalized in the background after stop(); wait before reading the file
+            await asyncio.to_thread(recorder_instance.wait_until_finalized)
+            # One recording per run: don't keep capturing (keep_stream_alive) during transcription
+            await asyncio.to_thread(recorder_instance.close)
         except Exception as e:
             print(f"[-] Recording failed: {e}")
             return
     
-    if not audio_path or not os.path.exists(audio_path) or os.path.getsize(audio_path) <= 44:
+    # One stat for the existence check, the size check and the messages below
+    try:
+        audio_size = os.stat(audio_path).st_size if audio_path else 0
+    except OSError:
+        audio_size = 0
+    if audio_size <= 44:
         print("\n[-] Error: Audio file is empty or was not created correctly.")
         print("    Check if your microphone is working and permissions are granted.")
         return
     
-    print(f"[+] Audio file ready: {audio_path} ({os.path.getsize(audio_path)} bytes)")
+    print(f"[+] Audio file ready: {audio_path} ({audio_size} bytes)")
     
     # 7. Transcribe
     print("\n" + "-" * 60)
@@ -204,51 +256,63 @@ async def main(existing_audio_path: str = None, force_setup: bool = False, mode:
     print("-" * 60)
     
     try:
-        trans_settings = config.get_transcription_settings()
-        transcript = processor.process_audio(
-            audio_path,
+        # trans_settings: read once, when the processor was created
+        options = dict(
             model=trans_settings.get('model', 'nova-2'),
             language=trans_settings.get('language', 'ru')
         )
-        
-        # Save transcript with timestamp
-        timestamp_str = start_datetime.strftime("%Y%m%d_%H%M%S")
-        transcript_filename = f"transcript_{timestamp_str}.md"
-        transcript_path = os.path.join(session_dir, transcript_filename)
-        
-        with open(transcript_path, "w") as f:
-            f.write(f"# Meeting Transcript\n\n")
-            f.write(f"**Date/Time:** {start_datetime.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            f.write(f"---\n\n")
-            f.write(transcript)
-        
-        print(f"[+] Transcript saved to: {transcript_path}")
-        
+        if audio_size <= IN_MEMORY_UPLOAD_LIMIT:
+            # Uploaded in one buffer: nothing runs alongside it in the CLI, so the blocking
+            # call skips the worker-thread hops of the async path
+            transcript = processor.process_audio(audio_path, **options)
+        else:
+            transcript = await processor.aprocess_audio(audio_path, **options)
     except Exception as e:
         print(f"[-] Transcription failed: {e}")
-        import traceback
         traceback.print_exc()
         return
     
+    # Save transcript with timestamp; written in the background while the summary is generated,
+    # and reported as soon as it's on disk rather than after the (much slower) summary
+    timestamp_str = run_datetime.strftime(FILE_TIMESTAMP_FORMAT)
+    transcript_filename = f"transcript_{timestamp_str}.md"
+    transcript_path = os.path.join(session_dir, transcript_filename)
+    transcript_write = asyncio.create_task(save_transcript(transcript_path, transcript, start_datetime))
+    # Let the write start before the summary request is built
+    await asyncio.sleep(0)
+    
     # 8. Summarize
     print("\n" + "-" * 60)
     print("[*] Starting Summarization")
     print("-" * 60)
     
+    # Save summary with timestamp
+    summary_filename = f"summary_{timestamp_str}.md"
+    summary_path = os.path.join(session_dir, summary_filename)
+    word_count = len(transcript.split())
+    if word_count < MIN_SUMMARY_WORDS:
+        print(f"[!] Transcript has only {word_count} words, skipping the LLM call")
+
     try:
-        summary = summarizer.summarize(transcript, meeting_datetime=start_datetime, mode=mode)
-        
-        # Save summary with timestamp
-        summary_filename = f"summary_{timestamp_str}.md"
-        summary_path = os.path.join(session_dir, summary_filename)
-        
-        with open(summary_path, "w") as f:
-            f.write(f"# Meeting Summary\n\n")
-            f.write(summary)
+        # Write tokens as they arrive, so the file can be followed while the model is still generating.
+        # Disk writes go through worker threads, so the event loop keeps serving the stream
+        f = await asyncio.to_thread(open, summary_path, "w")
+        try:
+            await asyncio.to_thread(append_and_flush, f, "# Meeting Summary\n\n")
+            if word_count < MIN_SUMMARY_WORDS:
+                await asyncio.to_thread(append_and_flush, f, "_Recording too short for a meaningful summary, see the transcript._\n")
+            else:
+                async for chunk in summarizer.astream_summary(transcript, meeting_datetime=start_datetime, mode=mode):
+                    await asyncio.to_thread(append_and_flush, f, chunk)
+        finally:
+            await asyncio.to_thread(f.close)
         
         print(f"[+] Summary saved to: {summary_path}")
         
     except Exception as e:
+        # Don't leave a half-written summary behind
+        if os.path.exists(summary_path):
+            os.remove(summary_path)
         error_str = str(e)
         # Suppress traceback for known credit/quota errors
         is_known_error = any(msg in error_str for msg in ["402", "Insufficient Balance", "insufficient_quota", "429"])
@@ -257,13 +321,28 @@ async def main(existing_audio_path: str = None, force_setup: bool = False, mode:
              print(f"[-] Summarization failed: LLM Quota or Balance issue.")
         else:
             print(f"[-] Summarization failed: {e}")
-            import traceback
             traceback.print_exc()
     
+    # The transcript write ran alongside the summary (and has normally finished long ago)
+    await transcript_write
+    
     print("\n" + "-" * 60)
     print(f"[+] Done! All files generated in: {session_dir}")
     print("-" * 60)
 
+async def run(**kwargs):
+    """main() with the recorder and the shared async connection pool closed on the loop that used them."""
+    try:
+        await main(**kwargs)
+    finally:
+        # Also covers runs that ended before main() closed the recorder (close() is idempotent)
+        if recorder_instance is not None:
+            try:
+                await asyncio.to_thread(recorder_instance.close)
+            except Exception as e:
+                print(f"[!] Failed to close recorder: {e}")
+        await close_async_http_client()
+
 if __name__ == "__main__":
     # Setup argument parser
     parser = argparse.ArgumentParser(
@@ -287,11 +366,19 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
     
+    # uvloop's loop (libuv) is faster than the default one; Windows isn't supported by it
+    run_loop = asyncio.run
     if sys.platform == 'win32':
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    else:
+        try:
+            import uvloop
+            run_loop = uvloop.run
+        except ImportError:
+            pass
     
     try:
-        asyncio.run(main(existing_audio_path=args.file, force_setup=args.setup, mode=args.mode))
+        run_loop(run(existing_audio_path=args.file, force_setup=args.setup, mode=args.mode))
     except KeyboardInterrupt:
         print("\n\n[!] Program stopped by user.")
         sys.exit(0)
@@ -1,9 +1,13 @@
 """Factory for creating appropriate audio recorder based on configuration."""
 import platform
+from concurrent.futures import ThreadPoolExecutor
 from core.config_manager import ConfigManager
 from core.recorders.base_recorder import BaseRecorder
-from core.recorders.legacy_recorder import LegacyRecorder
-from core.recorders.native_recorder import NativeRecorder
+
+# Resolved once: platform.mac_ver() may shell out to sw_vers on macOS
+_IS_DARWIN = platform.system() == "Darwin"
+_MAC_VERSION = platform.mac_ver()[0] if _IS_DARWIN else ""
+_MAC_MAJOR = int(_MAC_VERSION.split('.')[0]) if _MAC_VERSION else 0
 
 
 class RecorderFactory:
@@ -23,9 +27,11 @@ class RecorderFactory:
         elif method == "dual":
             from core.recorders.multi_recorder import MultiRecorder
             
-            # Create both recorders
-            native = RecorderFactory._create_native_recorder(config_manager)
-            legacy = RecorderFactory._create_legacy_recorder(config_manager)
+            # Create both recorders at once: framework loading and device probing mostly wait in native code
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                native = pool.submit(RecorderFactory._create_native_recorder, config_manager)
+                legacy = pool.submit(RecorderFactory._create_legacy_recorder, config_manager)
+                native, legacy = native.result(), legacy.result()
             
             print("[*] Initializing DUAL Recording Mode (Native + Legacy)")
             return MultiRecorder([native, legacy])
@@ -35,8 +41,11 @@ class RecorderFactory:
             )
     
     @staticmethod
-    def _create_legacy_recorder(config_manager: ConfigManager) -> LegacyRecorder:
+    def _create_legacy_recorder(config_manager: ConfigManager) -> BaseRecorder:
         """Create legacy recorder with configuration."""
+        # Imported here: a run only loads the backend(s) it actually uses
+        from core.recorders.legacy_recorder import LegacyRecorder
+        
         settings = config_manager.get_legacy_settings()
         
         return LegacyRecorder(
@@ -49,30 +58,31 @@ class RecorderFactory:
     def _create_native_recorder(config_manager: ConfigManager) -> BaseRecorder:
         """Create native macOS recorder with configuration."""
         # Check if running on macOS
-        if platform.system() != "Darwin":
+        if not _IS_DARWIN:
             raise RuntimeError(
                 "Native recorder is only available on macOS. "
                 "Please set recording_method to 'legacy' in config.json."
             )
         
         # Check macOS version (ScreenCaptureKit requires Ventura+)
-        version = platform.mac_ver()[0]
-        if version:
-            major_version = int(version.split('.')[0])
-            if major_version < 13:
-                raise RuntimeError(
-                    f"Native recorder requires macOS 13.0+ (Ventura), but you have {version}. "
-                    "Please use 'legacy' mode or upgrade macOS."
-                )
+        if _MAC_VERSION and _MAC_MAJOR < 13:
+            raise RuntimeError(
+                f"Native recorder requires macOS 13.0+ (Ventura), but you have {_MAC_VERSION}. "
+                "Please use 'legacy' mode or upgrade macOS."
+            )
         
         settings = config_manager.get_native_settings()
         
         try:
+            # Imported here: PyObjC/ScreenCaptureKit are slow to load and only needed for this mode
+            from core.recorders.native_recorder import NativeRecorder
+            
             # Our updated NativeRecorder now uses AVAssetWriter for robust capture without BlackHole
             print("[*] Using Native macOS Recorder (ScreenCaptureKit + AVAssetWriter)")
             return NativeRecorder(
                 samplerate=settings.get("samplerate", 48000),
-                exclude_current_process=settings.get("exclude_current_process", True)
+                exclude_current_process=settings.get("exclude_current_process", True),
+                keep_stream_alive=settings.get("keep_stream_alive", False)
             )
         except Exception as e:
             print(f"\n[!] Native recorder error: {e}")
@@ -89,19 +99,12 @@ class RecorderFactory:
         methods = ['legacy', 'dual']  # Legacy and dual (with fallback) always available
         
         # Check if native is available
-        if platform.system() == "Darwin":
+        if _IS_DARWIN and _MAC_MAJOR >= 13:
+            # Try importing native dependencies
             try:
-                version = platform.mac_ver()[0]
-                if version:
-                    major_version = int(version.split('.')[0])
-                    if major_version >= 13:
-                        # Try importing native dependencies
-                        try:
-                            from core.recorders.native_recorder import NATIVE_AVAILABLE
-                            if NATIVE_AVAILABLE:
-                                methods.append('native')
-                        except:
-                            pass
+                from core.recorders.native_recorder import NATIVE_AVAILABLE
+                if NATIVE_AVAILABLE:
+                    methods.append('native')
             except:
                 pass
         
@@ -0,0 +1,31 @@
+import pytest
+
+from core.recorders.base_recorder import BaseRecorder
+
+
+def test_incomplete_recorder_cant_be_instantiated():
+    class RecordOnly(BaseRecorder):
+        def record(self, output_dir="output", filename=None):
+            return ""
+
+    with pytest.raises(TypeError):
+        RecordOnly()
+
+
+def test_slotted_recorder_has_no_instance_dict():
+    class Slotted(BaseRecorder):
+        __slots__ = ("path",)
+        is_recording = False
+
+        def record(self, output_dir="output", filename=None):
+            return ""
+
+        def stop(self):
+            pass
+
+        def get_info(self):
+            return {}
+
+    recorder = Slotted()
+    assert not hasattr(recorder, "__dict__")
+    assert recorder.wait_until_finalized() is None
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from core.llm.chatgpt_provider import ChatGPTProvider
+
+_REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def _rate_limit_error(headers=None, body=None):
+    response = httpx.Response(429, headers=headers or {}, request=_REQUEST)
+    return RateLimitError("Error code: 429 - Rate limit reached", response=response, body=body)
+
+
+def _completion(text):
+    message = type("Message", (), {"content": text})
+    choice = type("Choice", (), {"message": message})
+    return type("Completion", (), {"choices": [choice]})
+
+
+def test_rate_limit_waits_for_retry_after():
+    provider = ChatGPTProvider(api_key="test-key")
+    assert provider._retry_delay(_rate_limit_error({"retry-after": "3"}), attempt=0) == 3.0
+
+
+def test_rate_limit_waits_for_retry_after_date():
+    provider = ChatGPTProvider(api_key="test-key")
+    soon = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=10), usegmt=True)
+    assert 8 <= provider._retry_delay(_rate_limit_error({"retry-after": soon}), attempt=0) <= 10
+
+    # Capped like the numeric form; a date already passed means retry right away
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(hours=1), usegmt=True)
+    assert provider._retry_delay(_rate_limit_error({"retry-after": later}), attempt=0) == 60
+    passed = format_datetime(datetime.now(timezone.utc) - timedelta(minutes=1), usegmt=True)
+    assert provider._retry_delay(_rate_limit_error({"retry-after": passed}), attempt=0) == 0
+
+
+def test_insufficient_quota_is_fatal():
+    provider = ChatGPTProvider(api_key="test-key")
+    error = _rate_limit_error(body={"code": "insufficient_quota", "message": "You exceeded your current quota"})
+    with pytest.raises(RateLimitError):
+        provider._retry_delay(error, attempt=0)
+
+
+def test_rate_limited_request_is_retried(monkeypatch):
+    provider = ChatGPTProvider(api_key="test-key")
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise _rate_limit_error({"retry-after": "3"})
+        return _completion("summary")
+
+    sleeps = []
+    monkeypatch.setattr(provider.client.chat.completions, "create", create)
+    monkeypatch.setattr("core.llm.chatgpt_provider.time.sleep", sleeps.append)
+
+    assert provider._complete("system", "user") == "summary"
+    assert sleeps == [3.0]
+    assert len(calls) == 2
@@ -0,0 +1,72 @@
+import pytest
+
+from core.llm import chunker
+from core.llm.base import LLMProvider
+from core.llm.cache import LLMCache
+from core.llm.chunker import ChunkedProvider
+from core.utils.prompt_manager import PromptManager
+
+# Two parts of ~two paragraphs each with these settings
+SETTINGS = {"threshold_tokens": 10, "max_tokens": 40, "overlap_tokens": 0, "max_parallel": 1}
+TRANSCRIPT = "\n\n".join(f"[00:0{i}] Speaker 0: " + f"слово{i} " * 15 for i in range(4))
+
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    # Splitting shouldn't depend on which tiktoken encodings are available offline
+    monkeypatch.setattr(chunker, "count_tokens", lambda text, model_name=None: len(text.split()))
+
+
+class FakeProvider(LLMProvider):
+    def __init__(self, display_name: str, model_name: str = "shared-model"):
+        super().__init__("test-key", model_name)
+        self.display_name = display_name
+        self.calls = []
+
+    def _complete(self, system_prompt: str, user_prompt: str) -> str:
+        self.calls.append(user_prompt)
+        return f"{self.display_name} notes"
+
+
+def test_notes_are_reused_for_the_same_provider():
+    cache = LLMCache()
+    provider = FakeProvider("A")
+    chunks = ChunkedProvider(provider, SETTINGS)._split(TRANSCRIPT)
+    assert len(chunks) > 1
+
+    ChunkedProvider(provider, SETTINGS, cache)._map(chunks, "meeting")
+    ChunkedProvider(provider, SETTINGS, cache)._map(chunks, "meeting")
+    assert len(provider.calls) == len(chunks)
+
+
+def test_notes_are_not_shared_between_providers_with_the_same_model():
+    cache = LLMCache()
+    a, b = FakeProvider("A"), FakeProvider("B")
+    chunks = ChunkedProvider(a, SETTINGS)._split(TRANSCRIPT)
+
+    ChunkedProvider(a, SETTINGS, cache)._map(chunks, "meeting")
+    combined = ChunkedProvider(b, SETTINGS, cache)._map(chunks, "meeting")
+    assert len(b.calls) == len(chunks)
+    assert "A notes" not in combined
+
+
+def test_notes_are_not_shared_between_modes():
+    cache = LLMCache()
+    provider = FakeProvider("A")
+    chunks = ChunkedProvider(provider, SETTINGS)._split(TRANSCRIPT)
+
+    ChunkedProvider(provider, SETTINGS, cache)._map(chunks, "meeting")
+    ChunkedProvider(provider, SETTINGS, cache)._map(chunks, "interview")
+    assert len(provider.calls) == 2 * len(chunks)
+
+
+def test_edited_mode_prompt_invalidates_notes(monkeypatch):
+    cache = LLMCache()
+    provider = FakeProvider("A")
+    chunks = ChunkedProvider(provider, SETTINGS)._split(TRANSCRIPT)
+
+    ChunkedProvider(provider, SETTINGS, cache)._map(chunks, "meeting")
+    prompt_class = type(PromptManager.get_prompt("meeting"))
+    monkeypatch.setattr(prompt_class, "get_system_prompt", lambda self: "Edited meeting instructions")
+    ChunkedProvider(provider, SETTINGS, cache)._map(chunks, "meeting")
+    assert len(provider.calls) == 2 * len(chunks)
@@ -0,0 +1,74 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from core.llm import gemini_provider
+from core.llm.gemini_provider import CONTEXT_CACHE_MIN_CHARS, GeminiProvider
+
+pytestmark = pytest.mark.skipif(not gemini_provider.USE_NEW_API, reason="context caches need google.genai")
+
+# Large enough to be served from a context cache
+SYSTEM_PROMPT = "x" * CONTEXT_CACHE_MIN_CHARS
+
+
+class CacheGone(Exception):
+    def __init__(self):
+        super().__init__("404 NOT_FOUND. CachedContent not found (or permission denied)")
+        self.code = 404
+
+
+def _provider(monkeypatch):
+    provider = GeminiProvider(api_key="test-key", model_name="gemini-1.5-flash")
+    calls = []
+
+    def generate_content(**kwargs):
+        calls.append(kwargs)
+        raise CacheGone()
+
+    async def agenerate_content(**kwargs):
+        generate_content(**kwargs)
+
+    created = iter(range(1000))
+    provider.client = SimpleNamespace(
+        caches=SimpleNamespace(create=lambda **kwargs: SimpleNamespace(name=f"cachedContents/{next(created)}")),
+        models=SimpleNamespace(generate_content=generate_content),
+        aio=SimpleNamespace(models=SimpleNamespace(generate_content=agenerate_content)),
+    )
+    monkeypatch.setattr(gemini_provider.time, "sleep", lambda seconds: None)
+    return provider, calls
+
+
+def test_cache_gone_on_every_attempt_raises(monkeypatch):
+    provider, calls = _provider(monkeypatch)
+    with pytest.raises(CacheGone):
+        provider._generate(SYSTEM_PROMPT, "transcript")
+    # The first failure recreates the cache once, the second one is reported
+    assert len(calls) == 2
+    assert calls[0]["config"].cached_content != calls[1]["config"].cached_content
+
+
+def test_cache_gone_on_every_attempt_raises_async(monkeypatch):
+    provider, calls = _provider(monkeypatch)
+    with pytest.raises(CacheGone):
+        asyncio.run(provider._agenerate(SYSTEM_PROMPT, "transcript"))
+    assert len(calls) == 2
+
+
+def test_fallback_model_is_per_call():
+    provider = GeminiProvider(api_key="test-key")
+    models = []
+
+    def generate_content(model, contents, config):
+        models.append(model)
+        if model == "gemini-2.0-flash":
+            raise Exception("429 RESOURCE_EXHAUSTED")
+        return SimpleNamespace(text=f"summary from {model}")
+
+    provider.client = SimpleNamespace(models=SimpleNamespace(generate_content=generate_content))
+
+    assert provider._generate("system", "transcript") == "summary from gemini-flash-latest"
+    # The shared provider (and with it the response cache key) keeps its configured model
+    assert provider.model_name == "gemini-2.0-flash"
+    provider._generate("system", "transcript")
+    assert models == ["gemini-2.0-flash", "gemini-flash-latest"] * 2
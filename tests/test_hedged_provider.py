@@ -0,0 +1,40 @@
+import asyncio
+
+from core.llm.base import LLMProvider
+from core.llm.cache import CachingProvider, LLMCache
+from core.llm.hedged import HedgedProvider
+
+
+class FakeProvider(LLMProvider):
+    def __init__(self, name: str, answer: str, delay: float = 0):
+        super().__init__(api_key="test-key", model_name=f"{name}-model")
+        self.display_name = name
+        self.answer = answer
+        self.delay = delay
+        self.calls = 0
+
+    def _complete(self, system_prompt: str, user_prompt: str) -> str:
+        return self.answer
+
+    async def asummarize(self, transcript, meeting_datetime=None, mode="meeting"):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.answer
+
+
+def test_backup_answer_is_not_cached_as_primary():
+    async def scenario():
+        primary = FakeProvider("Primary", "primary summary", delay=0.2)
+        backup = FakeProvider("Backup", "backup summary")
+        provider = CachingProvider(HedgedProvider([primary, backup], delay_ms=0), LLMCache())
+
+        assert await provider.asummarize("transcript") == "backup summary"
+
+        # The backup's answer wasn't cached under the primary, so the primary is asked this time
+        primary.delay = 0
+        backup.delay = 0.2
+        assert await provider.asummarize("transcript") == "primary summary"
+        assert await provider.asummarize("transcript") == "primary summary"
+        assert primary.calls == 2
+
+    asyncio.run(scenario())
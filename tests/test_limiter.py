@@ -0,0 +1,110 @@
+import asyncio
+import gc
+
+import pytest
+from fastapi import HTTPException
+from fastapi.responses import Response, StreamingResponse
+
+from core.limiter import RequestLimiter, limit
+
+SCOPE = {"type": "http", "asgi": {"spec_version": "2.4"}}
+
+
+async def _receive():
+    await asyncio.sleep(3600)
+
+
+def _streaming_endpoint(limiter):
+    @limit(limiter)
+    async def endpoint():
+        async def body():
+            yield b"first"
+            yield b"second"
+
+        return StreamingResponse(body())
+
+    return endpoint
+
+
+def test_streaming_response_holds_permit_until_sent():
+    async def scenario():
+        limiter = RequestLimiter(1)
+        endpoint = _streaming_endpoint(limiter)
+        response = await endpoint()
+
+        # The body hasn't been generated yet, so the request still counts
+        with pytest.raises(HTTPException) as busy:
+            await endpoint()
+        assert busy.value.status_code == 503
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await response(SCOPE, _receive, send)
+        assert [m.get("body") for m in sent[1:]] == [b"first", b"second", b""]
+        await endpoint()
+
+    asyncio.run(scenario())
+
+
+def test_permit_released_when_sending_fails():
+    async def scenario():
+        limiter = RequestLimiter(1)
+        endpoint = _streaming_endpoint(limiter)
+        response = await endpoint()
+
+        async def send(message):
+            raise OSError("client went away")
+
+        with pytest.raises(Exception):
+            await response(SCOPE, _receive, send)
+        del response
+        gc.collect()
+        await endpoint()
+
+    asyncio.run(scenario())
+
+
+def test_permit_released_when_response_never_sent():
+    async def scenario():
+        limiter = RequestLimiter(1)
+        endpoint = _streaming_endpoint(limiter)
+        response = await endpoint()
+        with pytest.raises(HTTPException):
+            await endpoint()
+
+        del response
+        gc.collect()
+        await endpoint()
+
+    asyncio.run(scenario())
+
+
+def test_streaming_response_is_returned_as_is():
+    async def scenario():
+        limiter = RequestLimiter(1)
+        original = StreamingResponse(iter([b"x"]), media_type="text/plain")
+
+        @limit(limiter)
+        async def endpoint():
+            return original
+
+        assert await endpoint() is original
+
+    asyncio.run(scenario())
+
+
+def test_plain_response_releases_on_return():
+    async def scenario():
+        limiter = RequestLimiter(1)
+
+        @limit(limiter)
+        async def endpoint():
+            return Response(b"summary")
+
+        await endpoint()
+        await endpoint()
+
+    asyncio.run(scenario())
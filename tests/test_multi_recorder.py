@@ -0,0 +1,66 @@
+import os
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+sf = pytest.importorskip("soundfile")
+
+from core.recorders.base_recorder import BaseRecorder
+from core.recorders.multi_recorder import MultiRecorder
+
+
+class BackgroundFinalizingRecorder(BaseRecorder):
+    """Like NativeRecorder: record() returns at stop(), the file appears a bit later."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._stopped = threading.Event()
+        self._finalizer = None
+
+    @property
+    def is_recording(self) -> bool:
+        return not self._stopped.is_set()
+
+    def record(self, output_dir="output", filename=None) -> str:
+        self._stopped.wait()
+        path = os.path.join(output_dir, filename)
+
+        def finalize():
+            time.sleep(self.delay)
+            sf.write(path, np.ones((4800, 1), dtype="int16"), 48000, subtype="PCM_16")
+
+        self._finalizer = threading.Thread(target=finalize)
+        self._finalizer.start()
+        return path
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def wait_until_finalized(self, timeout=None) -> None:
+        if self._finalizer is not None:
+            self._finalizer.join(timeout)
+
+    def close(self) -> None:
+        self.closed = True
+
+    def get_info(self):
+        return {"type": "fake"}
+
+
+def test_merge_waits_for_background_finalization(tmp_path):
+    recorder = MultiRecorder([BackgroundFinalizingRecorder(0.3), BackgroundFinalizingRecorder(0.1)])
+    threading.Timer(0.1, recorder.stop).start()
+
+    merged = recorder.record(str(tmp_path), "recording.wav")
+
+    assert merged == str(tmp_path / "recording.wav")
+    assert os.listdir(tmp_path) == ["recording.wav"]
+    assert sf.info(merged).frames == 4800
+
+
+def test_close_is_forwarded_to_sub_recorders():
+    recorders = [BackgroundFinalizingRecorder(0), BackgroundFinalizingRecorder(0)]
+    MultiRecorder(recorders).close()
+    assert all(getattr(recorder, "closed", False) for recorder in recorders)
@@ -0,0 +1,59 @@
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from core.llm.cache import SemanticIndex
+
+DIM = 8
+
+
+class FakeEncoder:
+    """Same text, same unit vector; texts sharing a prefix before ':' are close."""
+
+    def __init__(self, model_name):
+        pass
+
+    def encode(self, text, normalize_embeddings=True):
+        topic, _, detail = text.partition(":")
+        vector = np.random.default_rng(abs(hash(topic)) % 2**32).normal(size=DIM)
+        vector += 0.01 * np.random.default_rng(abs(hash(detail)) % 2**32).normal(size=DIM)
+        return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture(autouse=True)
+def fake_sentence_transformers(monkeypatch):
+    monkeypatch.setitem(sys.modules, "sentence_transformers", SimpleNamespace(SentenceTransformer=FakeEncoder))
+
+
+def test_match_found_behind_many_other_scopes():
+    index = SemanticIndex()
+    # Closer neighbours than the real match, all from other scopes
+    for n in range(40):
+        index.add(f"other-{n}", "standup:notes", f"other-key-{n}")
+    index.add("mine", "standup:notes, take two", "my-key")
+
+    assert index.lookup("mine", "standup:notes") == "my-key"
+    assert index.lookup("unknown", "standup:notes") is None
+    assert index.lookup("mine", "retro:something else") is None
+
+
+def test_entries_are_appended_and_reloaded(tmp_path):
+    index = SemanticIndex(directory=str(tmp_path))
+    index.add("mine", "standup:notes", "first-key")
+    index.add("mine", "retro:notes", "second-key")
+
+    log = tmp_path / "index.jsonl"
+    assert len(log.read_text().splitlines()) == 2
+
+    # An append cut short by a crash is dropped, the rest still loads
+    with open(log, "a") as f:
+        f.write('{"scope": "mine", "key": "half')
+    reloaded = SemanticIndex(directory=str(tmp_path))
+    assert reloaded.lookup("mine", "standup:notes") == "first-key"
+    assert reloaded.lookup("mine", "retro:notes") == "second-key"
+
+    reloaded.add("mine", "planning:notes", "third-key")
+    assert len(log.read_text().splitlines()) == 3
+    assert SemanticIndex(directory=str(tmp_path)).lookup("mine", "planning:notes") == "third-key"
@@ -0,0 +1,33 @@
+import pytest
+
+from core.llm.transcript_normalizer import normalize
+
+
+@pytest.mark.parametrize("line, expected", [
+    # Filler before a sentence end: no comma left dangling in front of the punctuation
+    ("важно, ммм.", "важно."),
+    ("Да, хм?", "Да?"),
+    ("Ну, э-э... ладно", "Ну... ладно"),
+    # Filler at the start of a line: no leading space left behind
+    ("Ммм, начнём.", "начнём."),
+    ("uh, so we go", "so we go"),
+    ("[00:01] Speaker 0: э, хорошо", "[00:01] Speaker 0: хорошо"),
+    # Filler inside a sentence
+    ("Это важно, э-э, да.", "Это важно, да."),
+    # Indentation of Markdown lists is kept
+    ("  - ммм, пункт", "  - пункт"),
+    # "м" alone is not a filler
+    ("5 м, не больше.", "5 м, не больше."),
+])
+def test_fillers_are_removed_with_their_punctuation(line, expected):
+    assert normalize(line) == expected
+
+
+def test_turns_left_empty_and_repeats_are_dropped():
+    transcript = "\n\n".join([
+        "[00:01] Speaker 0: Привет.",
+        "[00:03] Speaker 0: Привет.",
+        "[00:05] Speaker 1: ммм",
+        "[00:07] Speaker 1: Начнём.",
+    ])
+    assert normalize(transcript) == "[00:01] Speaker 0: Привет.\n\n[00:07] Speaker 1: Начнём."